@@ -1,27 +1,35 @@
-from scipy.linalg import toeplitz
 import sys
 import numpy as np
 import os
-import cv2
+import time
+from functools import partial
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QGridLayout, QPushButton, QLabel, 
                             QSlider, QFileDialog, QMessageBox, QSizePolicy,
-                            QFrame, QRadioButton, QButtonGroup, QDoubleSpinBox, QComboBox, QSpinBox, QTableWidget)
+                            QFrame, QRadioButton, QButtonGroup, QDoubleSpinBox, QComboBox, QSpinBox, QTableWidget,
+                            QCheckBox)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QCursor
-from skimage.metrics import peak_signal_noise_ratio, structural_similarity
-from numpy.fft import fft2, ifft2, fftshift, ifftshift
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import QHeaderView
-from scipy.signal import convolve2d
 import vtk
 from PyQt5.QtWidgets import QTableWidgetItem
 from vtkmodules.util import numpy_support
 from vtkmodules.vtkCommonDataModel import vtkImageData
-from vtkmodules.vtkRenderingCore import (vtkVolume, vtkVolumeProperty)
+from vtkmodules.vtkRenderingCore import vtkVolumeProperty
 from vtkmodules.vtkInteractionStyle import vtkInteractorStyleImage
 from vtkmodules.vtkRenderingVolume import vtkFixedPointVolumeRayCastMapper
 from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+from processing import (batch, deconvolution, edges, filters, frequency, geometry, pyramid, quantization, resolution,
+                        restoration, restoration_store)
+from processing.profiling import profiler
+from processing.reslice import Reslicer
+from processing.series import DicomSeries
+from processing.volume_cache import VolumeCache
+from workers import JobScheduler
+
+# Métodos de restauración en el orden de las columnas de la tabla de métricas
+RESTORATION_METHODS = ("CLS", "WCLS", "BMR") + deconvolution.FFT_RESTORATION_TYPES
 
 def resource_path(relative_path):
     try:
@@ -31,6 +39,154 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+class SlicePipeline:
+    """Pipeline VTK persistente de una vista 2D: se crea una vez y después solo se actualizan sus escalares"""
+
+    def __init__(self, renderer):
+        self.image_data = vtk.vtkImageData()
+
+        self.mapper = vtk.vtkImageSliceMapper()
+        self.mapper.SetInputData(self.image_data)
+        self.mapper.SetSliceNumber(0)
+
+        self.property = vtk.vtkImageProperty()
+        self.property.SetColorWindow(2000)
+        self.property.SetColorLevel(500)
+
+        self.actor = vtk.vtkImageSlice()
+        self.actor.SetMapper(self.mapper)
+        self.actor.SetProperty(self.property)
+        renderer.AddActor(self.actor)
+
+        self.buffer = None        # Datos que VTK referencia sin copiar
+        self.owns_buffer = False  # True si el buffer es una copia propia que se puede sobrescribir
+        self.vtk_array = None
+
+    def update(self, slice_data):
+        """Actualiza los escalares del pipeline; devuelve True si cambió el tamaño del slice"""
+        resized = self.buffer is None or self.buffer.shape != slice_data.shape
+
+        if slice_data.flags['C_CONTIGUOUS']:
+            # Sin copia: VTK lee directamente la memoria del slice
+            self.buffer = slice_data
+            self.owns_buffer = False
+            self.vtk_array = None
+        elif self.owns_buffer and not resized and self.buffer.dtype == slice_data.dtype:
+            # Reutilizar el buffer propio copiando en su lugar
+            np.copyto(self.buffer, slice_data)
+            self.vtk_array.Modified()
+        else:
+            self.buffer = np.ascontiguousarray(slice_data)
+            self.owns_buffer = True
+            self.vtk_array = None
+
+        if self.vtk_array is None:
+            self.vtk_array = numpy_support.numpy_to_vtk(self.buffer.ravel(), deep=False)
+            self.vtk_array.SetNumberOfComponents(1)
+            self.image_data.GetPointData().SetScalars(self.vtk_array)
+
+        if resized:
+            self.image_data.SetDimensions(slice_data.shape[1], slice_data.shape[0], 1)
+        self.image_data.Modified()
+        return resized
+
+class VolumePipeline:
+    """Pipeline VTK persistente de la vista 3D: el volumen se sube una vez y el umbral se aplica con la opacidad"""
+
+    # Factores de reducción de los niveles de detalle usados mientras se interactúa
+    LOD_FACTORS = (2, 4)
+
+    def __init__(self, renderer, images, spacing, window_level, window_width, fill_value):
+        self.signed = images.dtype.kind == 'i'
+        self.scalars = self._to_scalars(images)
+
+        # Nivel completo más niveles reducidos por promedio de área (sin aliasing), construidos una vez
+        # por estudio; el eje axial solo se reduce si el estudio tiene suficientes cortes
+        self.levels = [self._create_level(self.scalars, spacing)]
+        volume_pyramid = pyramid.Pyramid(images, reduce_depth=True)
+        for factor in self.LOD_FACTORS:
+            level = volume_pyramid.level(int(np.log2(factor)))
+            reduced = self._to_scalars(np.round(level).astype(images.dtype))
+            reduced_spacing = tuple(s * full / part for s, full, part in
+                                    zip(spacing, images.shape[::-1], level.shape[::-1]))
+            self.levels.append(self._create_level(reduced, reduced_spacing))
+
+        # Funciones de transferencia (color ajustado a rojo)
+        self.min_val = window_level - window_width / 2
+        self.max_val = window_level + window_width / 2
+        self.fill_value = fill_value
+
+        self.color_func = vtk.vtkColorTransferFunction()
+        self.color_func.AddRGBPoint(self.min_val, 1.0, 0.0, 0.0)  # Rojo para valores bajos
+        self.color_func.AddRGBPoint(self.max_val, 1.0, 0.0, 0.0)  # Rojo para valores altos
+
+        self.opacity_func = vtk.vtkPiecewiseFunction()
+
+        self.property = vtkVolumeProperty()
+        self.property.ShadeOn()
+        self.property.SetColor(self.color_func)
+        self.property.SetScalarOpacity(self.opacity_func)
+
+        # El prop elige automáticamente el nivel que cabe en el tiempo de cuadro asignado:
+        # reducido mientras se interactúa y completo al soltar el ratón
+        self.volume = vtk.vtkLODProp3D()
+        for level in self.levels:
+            level['lod_id'] = self.volume.AddLOD(level['mapper'], self.property, 0.0)
+        self.volume.AutomaticLODSelectionOn()
+        renderer.AddVolume(self.volume)
+
+    @staticmethod
+    def _to_scalars(images):
+        """Misma reinterpretación a unsigned short que al copiar con VTK_UNSIGNED_SHORT, pero sin copia"""
+        if images.dtype.itemsize == 2 and images.dtype.kind in 'iu':
+            return np.ascontiguousarray(images).view(np.uint16)
+        return images.astype(np.uint16)
+
+    @staticmethod
+    def _create_level(scalars, spacing):
+        """Crea la imagen VTK (sin copia) y el mapeador de un nivel de detalle"""
+        image_data = vtkImageData()
+        image_data.SetDimensions(scalars.shape[2], scalars.shape[1], scalars.shape[0])
+        image_data.SetSpacing(spacing)
+        vtk_array = numpy_support.numpy_to_vtk(scalars.ravel(), deep=False, array_type=vtk.VTK_UNSIGNED_SHORT)
+        image_data.GetPointData().SetScalars(vtk_array)
+
+        # Configurar mapeador de volumen
+        mapper = vtkFixedPointVolumeRayCastMapper()
+        mapper.SetInputData(image_data)
+        return {'scalars': scalars, 'image_data': image_data, 'vtk_array': vtk_array, 'mapper': mapper}
+
+    def _base_opacity(self, value):
+        """Opacidad original: alta para valores bajos y nula para valores altos"""
+        return float(np.interp(value, [self.min_val, self.max_val], [0.7, 0.0]))
+
+    def _original_value(self, value):
+        """Valor original del vóxel a partir de su representación unsigned short"""
+        return value - 65536 if self.signed and value >= 32768 else value
+
+    def set_threshold(self, threshold):
+        """
+        Aplica el umbral de isosuperficie solo con la función de opacidad.
+
+        Los vóxeles por debajo del umbral reciben la opacidad del valor de relleno, igual
+        que cuando se sustituían por self.borders[0] en una copia del volumen.
+        """
+        fill_opacity = self._base_opacity(int(self.fill_value) % 65536)
+        threshold_code = int(threshold) % 65536
+
+        # Puntos de quiebre: extremos, salto de signo, rampa de opacidad y umbral
+        breakpoints = {0, 32767, 32768, 65535,
+                       int(np.floor(self.min_val)), int(np.ceil(self.min_val)),
+                       int(np.floor(self.max_val)), int(np.ceil(self.max_val)),
+                       threshold_code - 1, threshold_code}
+
+        self.opacity_func.RemoveAllPoints()
+        for value in sorted(b for b in breakpoints if 0 <= b <= 65535):
+            if self._original_value(value) < threshold:
+                self.opacity_func.AddPoint(value, fill_opacity)
+            else:
+                self.opacity_func.AddPoint(value, self._base_opacity(value))
+
 class DICOMViewer(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -51,6 +207,7 @@ class DICOMViewer(QMainWindow):
         self.spacing = None          # Espaciado de la imagen
         self.window_level = 400      # Valor inicial de nivel de ventana
         self.window_width = 1500     # Valor inicial de ancho de ventana
+        self.volume_frame_time = 0.1 # Tiempo objetivo por cuadro (s) al rotar la vista 3D
         
         # Inicializar grupos de botones
         self.transform_options = QButtonGroup()
@@ -62,6 +219,39 @@ class DICOMViewer(QMainWindow):
         self.transformed_sagittal = None
         self.transformed_coronal = None
 
+        # Restauraciones bajo demanda: vistas de partida y parámetros del último "Aplicar" de mejoramiento
+        self.restoration_store = restoration_store.RestorationStore()
+        self.restoration_views = None
+        self.restoration_params = None
+        self.restoration_job = None  # Trabajo de restauración en curso (mostrar o métricas)
+        self.pending_metrics = []  # Métodos cuyas métricas se pidieron y aún no se escribieron
+
+        # Volumen derivado del último lote: (eje, volumen) que recorren los sliders de ese eje
+        self.batch_axes = {"Axial": "axial", "Sagital": "sagittal", "Coronal": "coronal"}
+        self.derived_volume = None
+        self.batch_running = False
+
+        # Pipelines VTK persistentes de las vistas 2D (por renderer) y de la vista 3D
+        self.slice_pipelines = {}
+        self.volume_pipeline = None
+
+        # Planificador de trabajos en segundo plano
+        self.job_scheduler = JobScheduler(parent=self)
+
+        # Serie DICOM que se decodifica en segundo plano y temporizador de progreso
+        self.series = None
+        self.volume_cache = VolumeCache()
+        self.loading_timer = QTimer()
+        self.loading_timer.setInterval(150)
+        self.loading_timer.timeout.connect(self.update_loading_progress)
+
+        # Cortes sagitales/coronales cacheados y refinado Lanczos al detener el arrastre
+        self.reslicer = None
+        self.reslice_timer = QTimer()
+        self.reslice_timer.setSingleShot(True)
+        self.reslice_timer.setInterval(150)
+        self.reslice_timer.timeout.connect(self.refine_reslices)
+
         # Barra de estado
         self.status_bar = QLabel("Listo")
         self.status_bar.setAlignment(Qt.AlignRight | Qt.AlignBottom)
@@ -109,6 +299,12 @@ class DICOMViewer(QMainWindow):
         load_btn.clicked.connect(self.load_dicom)
         barra1_layout.addWidget(load_btn)
 
+        # Vaciar la caché en disco de volúmenes decodificados
+        clear_cache_btn = QPushButton("Vaciar caché")
+        clear_cache_btn.setToolTip(f"Elimina los volúmenes guardados en {self.volume_cache.directory}")
+        clear_cache_btn.clicked.connect(self.clear_volume_cache)
+        barra1_layout.addWidget(clear_cache_btn)
+
         # Grupo de radio buttons para opciones principales
         self.transform_rb = QRadioButton("Transformación de Coordenadas")
         self.filter_rb = QRadioButton("Filtrado")
@@ -122,6 +318,18 @@ class DICOMViewer(QMainWindow):
         barra1_layout.addWidget(self.resolution_rb)
         barra1_layout.addWidget(self.spatial_improvement_rb)
 
+        # Modo por lotes: aplicar la operación a todos los cortes del eje elegido
+        self.batch_checkbox = QCheckBox("Volumen completo")
+        self.batch_axis_combo = QComboBox()
+        self.batch_axis_combo.addItems(list(self.batch_axes))
+        barra1_layout.addWidget(self.batch_checkbox)
+        barra1_layout.addWidget(self.batch_axis_combo)
+
+        # Panel de tiempos por etapa (perfilado)
+        self.profiling_checkbox = QCheckBox("Perfilado")
+        self.profiling_checkbox.toggled.connect(self.toggle_profiling)
+        barra1_layout.addWidget(self.profiling_checkbox)
+
         barra1_layout.addStretch()  # Empuja los siguientes widgets a la derecha
 
         # Botón Reiniciar
@@ -196,6 +404,8 @@ class DICOMViewer(QMainWindow):
         # Eliminar tamaño fijo de la ventana principal
         self.setMinimumSize(800, 600)  # Tamaño mínimo para evitar deformaciones
 
+        self.create_profiling_panel()
+
         # Configurar barra de estado
         self.status_bar.setParent(self)
         self.status_bar.setGeometry(self.width() - 200, self.height() - 40, 180, 30)
@@ -205,8 +415,79 @@ class DICOMViewer(QMainWindow):
     def resizeEvent(self, event):
         """Adjust the position of the status bar on window resize."""
         self.status_bar.setGeometry(self.width() - 200, self.height() - 40, 180, 30)
+        self.profiling_panel.setGeometry(20, self.height() - 300, 560, 280)
         super().resizeEvent(event)
 
+    def create_profiling_panel(self):
+        """Crea el panel flotante con los tiempos por etapa del perfilador"""
+        self.profiling_panel = QFrame(self)
+        self.profiling_panel.setStyleSheet("""
+            QFrame {
+                background-color: rgba(40, 40, 40, 220);
+                border-radius: 5px;
+            }
+            QLabel {
+                color: white;
+                font-family: monospace;
+            }
+        """)
+        panel_layout = QVBoxLayout()
+        self.profiling_panel.setLayout(panel_layout)
+
+        self.profiling_label = QLabel()
+        self.profiling_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        panel_layout.addWidget(self.profiling_label, stretch=1)
+
+        buttons_layout = QHBoxLayout()
+        export_btn = QPushButton("Exportar traza")
+        export_btn.clicked.connect(self.export_profiling_trace)
+        clear_btn = QPushButton("Limpiar")
+        clear_btn.clicked.connect(profiler.clear)
+        buttons_layout.addWidget(export_btn)
+        buttons_layout.addWidget(clear_btn)
+        panel_layout.addLayout(buttons_layout)
+
+        self.profiling_panel.hide()
+        self.profiling_timer = QTimer()
+        self.profiling_timer.setInterval(500)
+        self.profiling_timer.timeout.connect(self.update_profiling_panel)
+
+        # Si se activó con DICOM_VIEWER_PROFILE, mostrar el panel desde el inicio
+        self.profiling_checkbox.setChecked(profiler.enabled)
+
+    def toggle_profiling(self, enabled):
+        """Activa o desactiva el registro de etapas y su panel"""
+        if enabled:
+            if not profiler.enabled:
+                profiler.enable()
+            self.update_profiling_panel()
+            self.profiling_panel.show()
+            self.profiling_panel.raise_()
+            self.profiling_timer.start()
+        else:
+            profiler.disable()
+            self.profiling_timer.stop()
+            self.profiling_panel.hide()
+
+    def update_profiling_panel(self):
+        """Muestra las etapas con más tiempo acumulado"""
+        stats = sorted(profiler.summary().items(), key=lambda item: item[1]["total"], reverse=True)[:14]
+        lines = [f"{'Etapa':32s}{'n':>6s}{'último':>10s}{'medio':>10s}{'total':>10s}"]
+        for name, entry in stats:
+            lines.append(f"{name[:32]:32s}{entry['count']:6d}{entry['last'] * 1000:8.1f}ms"
+                         f"{entry['mean'] * 1000:8.1f}ms{entry['total']:9.2f}s")
+        self.profiling_label.setText("\n".join(lines))
+
+    def export_profiling_trace(self):
+        """Guarda las etapas registradas como traza de Chrome (chrome://tracing o Perfetto)"""
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar traza", "traza.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            profiler.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Error al exportar la traza:\n{str(e)}")
+
     def show_status_bar(self, message):
         """Show the status bar with a message."""
         self.status_bar.setText(message)
@@ -428,7 +709,8 @@ class DICOMViewer(QMainWindow):
         spatial_info_icon.setStyleSheet("margin-bottom: 5px;")  # Espacio entre el título y el icono
         spatial_info_icon.setToolTip("Permite restaurar o mejorar la calidad de las imágenes degradadas mediante " \
                                     "algoritmos avanzados de reconstrucción, como CLS (Constrained Least Squares), " \
-                                    "WCLS (Weighted CLS) y BMR (Bayesian Mean Restoration). Estos métodos ayudan a reducir " \
+                                    "WCLS (Weighted CLS) y BMR (Bayesian Mean Restoration), o CLS en el dominio de " \
+                                    "Fourier, más rápidos en cortes grandes y capaces de modelar una dispersión 2D. Estos métodos ayudan a reducir " \
                                     "el desenfoque y el ruido, recuperando detalles y mejorando la visualización. Puedes " \
                                     "comparar los resultados de cada método y visualizar métricas objetivas de calidad (PSNR, " \
                                     "IOSNR, MAE, SSIM) para cada vista.")
@@ -453,6 +735,22 @@ class DICOMViewer(QMainWindow):
         spatial_layout.addWidget(dispersion_label)
         spatial_layout.addWidget(self.dispersion_width_input)
 
+        # Selector: dimensión de la función de dispersión (la 2D solo la modelan los métodos FFT)
+        psf_label = QLabel("Función de dispersión:")
+        self.psf_combo = QComboBox()
+        self.psf_combo.addItems(deconvolution.PSF_MODES)
+        self.psf_combo.setToolTip("1D: dispersión a lo largo de las filas (modelo de CLS, WCLS y BMR). "
+                                  "2D: el mismo perfil en filas y columnas, restaurado con los métodos FFT.")
+        self.psf_combo.setStyleSheet("""
+            QComboBox {
+                padding: 5px;
+                border: 1px solid #ced4da;
+                border-radius: 4px;
+            }
+        """)
+        spatial_layout.addWidget(psf_label)
+        spatial_layout.addWidget(self.psf_combo)
+
         # Botón APLICAR (centrado)
         self.apply_button = QPushButton("APLICAR")
         self.apply_button.setCursor(QCursor(Qt.PointingHandCursor))  # Cambiar cursor a mano
@@ -486,7 +784,7 @@ class DICOMViewer(QMainWindow):
         # Selector: Visualización
         visualization_label = QLabel("Visualización:")
         self.visualization_combo = QComboBox()
-        self.visualization_combo.addItems(["CLS", "WCLS", "BMR", "Imagen Degradada", "Imagen Original"])
+        self.visualization_combo.addItems(list(RESTORATION_METHODS) + [restoration_store.DEGRADED, "Imagen Original"])
         self.visualization_combo.setStyleSheet("""
             QComboBox {
                 padding: 5px;
@@ -500,8 +798,8 @@ class DICOMViewer(QMainWindow):
         spatial_layout.addWidget(self.visualization_combo)
 
         # Tabla de métricas
-        self.metrics_table = QTableWidget(12, 3)  # Cambiar a 3 columnas
-        self.metrics_table.setHorizontalHeaderLabels(["CLS", "WCLS", "BMR"])
+        self.metrics_table = QTableWidget(12, len(RESTORATION_METHODS))  # Una columna por método
+        self.metrics_table.setHorizontalHeaderLabels(list(RESTORATION_METHODS))
         self.metrics_table.setVerticalHeaderLabels([
             "PSNR Axial (dB)", "IOSNR Axial (dB)", "MAE Axial", "SSIM Axial",
             "PSNR Sagital (dB)", "IOSNR Sagital (dB)", "MAE Sagital", "SSIM Sagital",
@@ -604,18 +902,34 @@ class DICOMViewer(QMainWindow):
         self.options2_layout.addStretch()
 
         # Conectar el ComboBox de visualización al método de instancia
-        self.visualization_combo.currentTextChanged.connect(lambda metodo: self._actualizar_vistas_wrapper(metodo))
-
-    def _actualizar_vistas_wrapper(self, metodo):
-        # Llama a la función interna actualizar_vistas definida en apply_spatial_improvement
-        if hasattr(self, '_actualizar_vistas_func'):
-            self._actualizar_vistas_func(metodo)
-
-
+        self.visualization_combo.currentTextChanged.connect(self.show_restoration)
+        self.metrics_table.cellClicked.connect(self.request_restoration_metrics)
+        self.psf_combo.currentTextChanged.connect(self.update_restoration_methods)
 
         # Mostrar los resultados actualizados
         self.display_transformed_slices()
 
+    def update_restoration_methods(self, psf):
+        """Con la PSF 2D solo los métodos FFT modelan la degradación: los matriciales y sus columnas se desactivan"""
+        matrix_enabled = psf == "1D"
+        if self.restoration_views is not None:
+            # Las restauraciones ya aplicadas pasan a la nueva PSF (se vuelven a calcular bajo demanda)
+            self.restoration_params["psf"] = psf
+            self.clear_metrics_table()
+
+        # Se cambia la selección antes de desactivar el método actual, que el combo volvería a emitir
+        current = self.visualization_combo.currentText()
+        if not matrix_enabled and current in restoration.MATRIX_RESTORATION_TYPES:
+            self.visualization_combo.setCurrentText(deconvolution.FFT_RESTORATION_TYPES[0])
+        elif self.restoration_views is not None:
+            self.show_restoration(current)
+
+        model = self.visualization_combo.model()
+        for index, method in enumerate(RESTORATION_METHODS):
+            if method not in deconvolution.FFT_RESTORATION_TYPES:
+                model.item(index).setEnabled(matrix_enabled)
+                self.metrics_table.setColumnHidden(index, not matrix_enabled)
+
     def create_frequency_domain_filter_group(self, parent_layout):
         """Grupo para Filtrado en el Dominio Frecuencial"""
         container = QFrame()
@@ -728,6 +1042,7 @@ class DICOMViewer(QMainWindow):
         row2_layout = QHBoxLayout()
         self.spatial_window_combo = QComboBox()
         self.spatial_window_combo.addItems(["Media"])  # Inicialmente solo "Media"
+        self.spatial_window_combo.currentTextChanged.connect(self.on_edge_kernel_changed)
         row2_layout.addWidget(QLabel("Ventana:"))
         row2_layout.addWidget(self.spatial_window_combo)
 
@@ -741,6 +1056,11 @@ class DICOMViewer(QMainWindow):
 
         layout.addLayout(row2_layout)
 
+        # Banco de bordes: todas las respuestas del corte se calculan una vez y el combo cambia entre ellas
+        self.edge_bank_checkbox = QCheckBox("Banco de bordes (aplicar al cambiar de ventana)")
+        self.edge_bank_checkbox.setEnabled(False)  # Solo habilitado para Pasa Altas
+        layout.addWidget(self.edge_bank_checkbox)
+
         parent_layout.addWidget(container)
 
     def update_spatial_input_label(self):
@@ -763,9 +1083,20 @@ class DICOMViewer(QMainWindow):
                 "Prewitt-S", "Prewitt-SW", "Prewitt-W", "Prewitt-NW",
                 
                 # Laplace (3 variantes)
-                "Laplace", "Laplace-8", "Laplace-D"
+                "Laplace", "Laplace-8", "Laplace-D",
+
+                # Gradiente Sobel
+                *edges.GRADIENT_MAPS
             ])
             self.kernel_size_input.setEnabled(False)
+        self.edge_bank_checkbox.setEnabled(self.spatial_type_combo.currentText() == "Pasa Altas")
+
+    def on_edge_kernel_changed(self, filter_name):
+        """Con el banco de bordes activo, muestra la respuesta del nuevo kernel sin esperar a Aplicar"""
+        if (self.edge_bank_checkbox.isChecked() and self.edge_bank_checkbox.isEnabled() and filter_name
+                and self.spatial_type_combo.currentText() == "Pasa Altas"
+                and self.images is not None and not self.batch_checkbox.isChecked()):
+            self.apply_filters()
 
     def update_filter_controls(self):
         """Habilita solo los controles correspondientes al RadioButton seleccionado"""
@@ -786,6 +1117,7 @@ class DICOMViewer(QMainWindow):
         self.spatial_input.setEnabled(is_spatial_selected)
         self.spatial_window_combo.setEnabled(is_spatial_selected)
         self.kernel_size_input.setEnabled(is_spatial_selected and self.spatial_type_combo.currentText() == "Pasa Bajas")
+        self.edge_bank_checkbox.setEnabled(is_spatial_selected and self.spatial_type_combo.currentText() == "Pasa Altas")
 
     def create_transform_inputs(self, transform_layout):
         """Crea los grupos de opciones con estilo de secciones diferenciadas"""
@@ -1068,6 +1400,12 @@ class DICOMViewer(QMainWindow):
         self.reset_views()
         self.show_options_container(option_type)
 
+    def clear_volume_cache(self):
+        """Elimina los volúmenes de la caché en disco; la serie abierta sigue en memoria"""
+        removed, freed = self.volume_cache.clear()
+        self.show_status_bar(f"CACHÉ VACIADA: {removed} VOLÚMENES ({freed / 1024 ** 2:.0f} MB)")
+        self.status_bar_timer.start(4000)
+
     def load_dicom(self):
         self.show_status_bar("CARGANDO...")
         QApplication.processEvents()  # Ensure UI updates immediately
@@ -1077,27 +1415,24 @@ class DICOMViewer(QMainWindow):
             return
 
         try:
-            # Suppress VTK error messages
-            vtk.vtkObject.GlobalWarningDisplayOff()
-
-            # Verificar si el directorio contiene archivos DICOM válidos
-            reader = vtk.vtkDICOMImageReader()
-            reader.SetDirectoryName(folder)
-            reader.Update()
+            # Detener la carga de la serie anterior si aún estaba en curso
+            self.stop_series_loading()
 
-            if reader.GetOutput().GetDimensions() == (0, 0, 0):
-                raise ValueError("El directorio no contiene imágenes DICOM válidas.")
-
-            # Obtener datos como matriz numpy 3D
-            vtk_data = reader.GetOutput().GetPointData().GetScalars()
-            self.dims = reader.GetOutput().GetDimensions()
-            self.images = numpy_support.vtk_to_numpy(vtk_data).reshape(self.dims[2], self.dims[1], self.dims[0])
+            # Mapear el volumen desde la caché o indexar cabeceras y decodificar solo el corte central;
+            # el resto se decodifica en segundo plano y se guarda en la caché al terminar
+            self.series = DicomSeries(folder, cache=self.volume_cache)
+            self.dims = self.series.dims
+            self.images = self.series.volume
 
             # Guardar dimensiones y espaciado
-            self.spacing = reader.GetOutput().GetSpacing()
-
-            # Calcular y almacenar los valores máximo y mínimo de las imágenes
-            self.borders = (self.images.min(), self.images.max())
+            self.spacing = self.series.spacing
+            self.reslicer = Reslicer(self.images, self.spacing)
+            self.derived_volume = None
+            self.restoration_views = None
+            self.restoration_store.clear()
+
+            # Valores mínimo y máximo (provisionales si la carga aún no terminó)
+            self.borders = self.series.value_range()
             self.current_isosurface = sum(self.borders) // 2
 
             # Punto inicial de los sliders
@@ -1107,7 +1442,6 @@ class DICOMViewer(QMainWindow):
 
             print(f"Dimensiones del volumen: {self.dims}")
             print(f"Espaciado: {self.spacing}")
-            print(f"Valores mínimo y máximo: {self.borders}")
 
             # Actualizar los valores de inputs de traslación
             self.h_translation_input.setRange(-self.dims[0], self.dims[0])
@@ -1118,16 +1452,65 @@ class DICOMViewer(QMainWindow):
             # Al cargar imágenes, habilitar Guardar y Reiniciar
             self.set_save_and_reset_enabled(True)
 
+            if self.series.is_complete():
+                self.hide_status_bar()  # Volumen servido desde la caché
+            else:
+                self.series.start()
+                self.show_status_bar(f"CARGANDO {self.series.decoded_count()}/{self.dims[2]}")
+                self.loading_timer.start()
+
         except Exception as e:
+            self.hide_status_bar()
             QMessageBox.critical(self, "Error", f"Error al cargar DICOM:\n{str(e)}")
             print(f"Error al cargar DICOM: {str(e)}")
-        finally:
-            self.hide_status_bar()
+
+    def update_loading_progress(self):
+        """Refresca el progreso de la carga en segundo plano y las vistas que cruzan todos los cortes"""
+        if self.series is None:
+            self.loading_timer.stop()
+            return
+        if self.series.is_complete():
+            self.finish_series_loading()
+            return
+        self.show_status_bar(f"CARGANDO {self.series.decoded_count()}/{self.dims[2]}")
+        self.reslicer.clear()  # Los cortes guardados pueden tener huecos aún sin decodificar
+        self.refine_reslices()  # Solo redibuja: no cancela trabajos ni descarta sus resultados
+
+    def finish_series_loading(self):
+        """Completa la carga: rango de valores definitivo y construcción de la vista 3D"""
+        self.loading_timer.stop()
+
+        # Calcular y almacenar los valores máximo y mínimo de las imágenes
+        self.borders = self.series.value_range()
+        self.current_isosurface = sum(self.borders) // 2
+        print(f"Valores mínimo y máximo: {self.borders}")
+
+        self.volume_slider.blockSignals(True)
+        self.volume_slider.setRange(self.borders[0], self.borders[1])
+        self.volume_slider.setValue(self.borders[0])
+        self.volume_slider.blockSignals(False)
+
+        self.reslicer.clear()
+        self.refine_reslices()
+        self.update_3d_volume()
+        self.hide_status_bar()
+
+    def stop_series_loading(self):
+        """Detiene la decodificación en segundo plano de la serie actual"""
+        self.loading_timer.stop()
+        if self.series is not None:
+            self.series.stop()
+            self.series = None
+
+    def is_series_loading(self):
+        return self.series is not None and not self.series.is_complete()
 
     def create_vtk_widgets(self):
         """Configura las visualizaciones para las 3 vistas y la vista 3D"""
 
         # Limpiar widgets anteriores
+        self.slice_pipelines = {}
+        self.volume_pipeline = None
         for i in reversed(range(self.viz_layout.count())): 
             widget = self.viz_layout.itemAt(i).widget()
             if widget is not None:
@@ -1243,9 +1626,17 @@ class DICOMViewer(QMainWindow):
         self.sagittal_vtk_widget.GetRenderWindow().GetInteractor().SetInteractorStyle(style_sagittal)
         self.coronal_vtk_widget.GetRenderWindow().GetInteractor().SetInteractorStyle(style_coronal)
         self.volume_vtk.GetRenderWindow().GetInteractor().SetInteractorStyle(vtk.vtkInteractorStyleTrackballCamera())
+        self.set_volume_frame_time(self.volume_frame_time)
 
         self.set_fixed_vtk_widget_sizes()
 
+    def set_volume_frame_time(self, seconds):
+        """Configura el tiempo objetivo por cuadro de la vista 3D mientras se interactúa"""
+        self.volume_frame_time = seconds
+        interactor = self.volume_vtk.GetRenderWindow().GetInteractor()
+        interactor.SetDesiredUpdateRate(1.0 / seconds)  # Durante la interacción: nivel reducido
+        interactor.SetStillUpdateRate(0.001)            # Al terminar: calidad completa
+
     def set_fixed_vtk_widget_sizes(self):
         """Establece tamaños fijos para las vistas de visualización"""
         fixed_width = 450  # Ancho fijo en píxeles (más ancho para hacerlo rectangular)
@@ -1261,6 +1652,11 @@ class DICOMViewer(QMainWindow):
         self.viz_layout.setSizeConstraint(QGridLayout.SetFixedSize)
 
     def reset_views(self):
+        self.job_scheduler.cancel()
+        self.batch_running = False
+        self.derived_volume = None
+        self.restoration_views = None
+        self.hide_status_bar()
         self.transformed_axial = self.current_axial
         self.transformed_sagittal = self.current_sagittal
         self.transformed_coronal = self.current_coronal
@@ -1290,147 +1686,97 @@ class DICOMViewer(QMainWindow):
 
     def display_slice(self, slice_data, renderer, vtk_widget):
         """Muestra un slice 2D en el renderer especificado"""
-        # Limpiar el renderer primero
-        renderer.RemoveAllViewProps()
-        
-        # Convertir numpy array a imagen VTK
-        vtk_image = numpy_support.numpy_to_vtk(slice_data.ravel(), deep=True)
-        vtk_image.SetNumberOfComponents(1)
-        
-        image_data = vtk.vtkImageData()
-        image_data.SetDimensions(slice_data.shape[1], slice_data.shape[0], 1)
-        image_data.GetPointData().SetScalars(vtk_image)
-        
-        # Crear mapper y actor
-        mapper = vtk.vtkImageSliceMapper()
-        mapper.SetInputData(image_data)
-        mapper.SetSliceNumber(0)
-        
-        property = vtk.vtkImageProperty()
-        property.SetColorWindow(2000)
-        property.SetColorLevel(500)
-        
-        actor = vtk.vtkImageSlice()
-        actor.SetMapper(mapper)
-        actor.SetProperty(property)
-        
-        renderer.AddActor(actor)
-        renderer.ResetCamera()
-        vtk_widget.GetRenderWindow().Render()
+        # Reutilizar el pipeline de la vista; solo se crea la primera vez
+        pipeline = self.slice_pipelines.get(renderer)
+        if pipeline is None:
+            pipeline = SlicePipeline(renderer)
+            self.slice_pipelines[renderer] = pipeline
+
+        # Recentrar la cámara solo si cambia el tamaño, para conservar el zoom y el desplazamiento
+        with profiler.stage("vista.actualizar", corte=slice_data):
+            if pipeline.update(slice_data):
+                renderer.ResetCamera()
+        with profiler.stage("vtk.render"):
+            vtk_widget.GetRenderWindow().Render()
 
     def update_axial_view(self):
         """Actualiza la vista axial con el slice actual"""
         self.current_axial = self.axial_slider.value()
-        # Obtener slice axial
-        axial_slice = self.images[self.current_axial, :, :]
+        self.cancel_pending_job()
+        # Decodificar el corte bajo demanda si la carga en segundo plano aún no llegó a él
+        if self.series is not None:
+            self.series.decode_slice(self.current_axial)
+        # Obtener slice axial (del volumen derivado si hay un lote axial)
+        axial_slice = self.derived_slice("axial", self.current_axial)
+        if axial_slice is not None:
+            self.transformed_axial = axial_slice
+        else:
+            axial_slice = self.images[self.current_axial, :, :]
         
         # Convertir a imagen VTK y mostrar
         self.display_slice(axial_slice, self.axial_renderer, self.axial_vtk_widget)
 
     def update_sagittal_view(self):
         self.current_sagittal = self.sagittal_slider.value()
-        self.transformed_sagittal = None  # Reset al cambiar slice
+        self.cancel_pending_job()
+        self.transformed_sagittal = self.derived_slice("sagittal", self.current_sagittal)  # Reset al cambiar slice
+        if self.transformed_sagittal is not None:
+            self.display_slice(self.transformed_sagittal, self.sagittal_renderer, self.sagittal_vtk_widget)
+            return
         # Mostramos la imagen con transformaciones iniciales
-        sagittal_slice = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
+        sagittal_slice = self.get_resliced("sagittal", self.current_sagittal, self.sagittal_slider.isSliderDown())
         self.display_slice(sagittal_slice, self.sagittal_renderer, self.sagittal_vtk_widget)
 
     def update_coronal_view(self):
         self.current_coronal = self.coronal_slider.value()
-        self.transformed_coronal = None  # Reset al cambiar slice
+        self.cancel_pending_job()
+        self.transformed_coronal = self.derived_slice("coronal", self.current_coronal)  # Reset al cambiar slice
+        if self.transformed_coronal is not None:
+            self.display_slice(self.transformed_coronal, self.coronal_renderer, self.coronal_vtk_widget)
+            return
         # Mostramos la imagen con transformaciones iniciales
-        coronal_slice = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
+        coronal_slice = self.get_resliced("coronal", self.current_coronal, self.coronal_slider.isSliderDown())
         self.display_slice(coronal_slice, self.coronal_renderer, self.coronal_vtk_widget)
 
-    def update_isosurface(self):
-        """Devuelve una copia de self.images con valores mayores o iguales a self.current_isosurface"""
-        if self.images is None:
-            return None
-        
-        # Crear una copia de self.images
-        isosurface_images = self.images.copy()
-        
-        # Filtrar valores menores a self.current_isosurface
-        isosurface_images[isosurface_images < self.current_isosurface] = self.borders[0]
-        
-        return isosurface_images
-
     def update_3d_volume(self):
         """Actualiza el volumen 3D con la configuración actual"""
-        # Desactivar el interactor antes de realizar cambios
-        interactor = self.volume_vtk.GetRenderWindow().GetInteractor()
-        if interactor:
-            interactor.Disable()
-
-        # Limpiar el renderer
-        self.volume_renderer.RemoveAllViewProps()
         self.current_isosurface = self.volume_slider.value()
-        isosurface_images = self.update_isosurface()
-        
-        # Convertir a VTK ImageData
-        vtk_img = vtkImageData()
-        vtk_img.SetDimensions(isosurface_images.shape[2], isosurface_images.shape[1], isosurface_images.shape[0])
-        vtk_img.SetSpacing(self.spacing)
-        vtk_img.AllocateScalars(vtk.VTK_UNSIGNED_SHORT, 1)
-        
-        vtk_array = numpy_support.numpy_to_vtk(
-            isosurface_images.ravel(), deep=True, array_type=vtk.VTK_UNSIGNED_SHORT)
-        vtk_img.GetPointData().SetScalars(vtk_array)
-        
-        # Configurar mapeador de volumen
-        volume_mapper = vtkFixedPointVolumeRayCastMapper()
-        volume_mapper.SetInputData(vtk_img)
-        
-        # Configurar propiedades del volumen
-        volume_property = vtkVolumeProperty()
-        volume_property.ShadeOn()
-        
-        # Funciones de transferencia (color ajustado a rojo)
-        min_val = self.window_level - self.window_width / 2
-        max_val = self.window_level + self.window_width / 2
-        
-        color_func = vtk.vtkColorTransferFunction()
-        color_func.AddRGBPoint(min_val, 1.0, 0.0, 0.0)  # Rojo para valores bajos
-        color_func.AddRGBPoint(max_val, 1.0, 0.0, 0.0)  # Rojo para valores altos
-        
-        opacity_func = vtk.vtkPiecewiseFunction()
-        opacity_func.AddPoint(min_val, 0.7)  # Opacidad alta para valores bajos
-        opacity_func.AddPoint(max_val, 0.0)  # Opacidad baja para valores altos
-        
-        volume_property.SetColor(color_func)
-        volume_property.SetScalarOpacity(opacity_func)
-        
-        # Crear volumen
-        volume = vtkVolume()
-        volume.SetMapper(volume_mapper)
-        volume.SetProperty(volume_property)
-        
-        self.volume_renderer.AddVolume(volume)
-        self.volume_renderer.ResetCamera()
-        
-        # Reactivar el interactor después de realizar cambios
-        if interactor:
-            interactor.Enable()
-        
+
+        # La vista 3D se construye cuando el volumen está completo
+        if self.is_series_loading():
+            return
+
+        # El volumen se sube a VTK una sola vez por estudio
+        if self.volume_pipeline is None:
+            with profiler.stage("vista3d.pipeline", volumen=self.images):
+                self.volume_pipeline = VolumePipeline(self.volume_renderer, self.images, self.spacing,
+                                                      self.window_level, self.window_width, self.borders[0])
+            self.volume_pipeline.set_threshold(self.current_isosurface)
+            self.volume_renderer.ResetCamera()
+        else:
+            self.volume_pipeline.set_threshold(self.current_isosurface)
+
         # Renderizar la ventana
-        self.volume_vtk.GetRenderWindow().Render()
-
-    def prepare_sagittal_slice(self, slice_img):
-        """Aplica las transformaciones iniciales a la vista sagital"""
-        # Transponer y rotar
-        slice_img = slice_img.T
-        slice_img = np.rot90(slice_img, k=1, axes=(0, 1))
-        # Redimensionar para mantener relación de aspecto
-        slice_img = cv2.resize(slice_img, (self.dims[0]-1, self.dims[1]-1), interpolation=cv2.INTER_LANCZOS4)
-        return slice_img
-
-    def prepare_coronal_slice(self, slice_img):
-        """Aplica las transformaciones iniciales a la vista coronal"""
-        # Transponer y rotar
-        slice_img = slice_img.T
-        slice_img = np.rot90(slice_img, k=1, axes=(0, 1))
-        # Redimensionar para mantener relación de aspecto
-        slice_img = cv2.resize(slice_img, (self.dims[0]-1, self.dims[1]-1), interpolation=cv2.INTER_LANCZOS4)
-        return slice_img
+        with profiler.stage("vtk.render_3d"):
+            self.volume_vtk.GetRenderWindow().Render()
+
+    def get_resliced(self, axis, index, scrubbing):
+        """Corte sagital/coronal preparado; durante el arrastre usa interpolación rápida y programa el refinado"""
+        if scrubbing and not self.reslicer.is_cached(axis, index):
+            self.reslice_timer.start()
+            return self.reslicer.get(axis, index, fast=True)
+        return self.reslicer.get(axis, index)
+
+    def refine_reslices(self):
+        """Vuelve a mostrar en versión Lanczos los cortes de origen de las vistas sin resultados (sin cancelar trabajos)"""
+        if self.reslicer is None:
+            return
+        if self.transformed_sagittal is None:
+            self.display_slice(self.reslicer.get("sagittal", self.current_sagittal),
+                               self.sagittal_renderer, self.sagittal_vtk_widget)
+        if self.transformed_coronal is None:
+            self.display_slice(self.reslicer.get("coronal", self.current_coronal),
+                               self.coronal_renderer, self.coronal_vtk_widget)
 
     def closeEvent(self, event):
         """Maneja el cierre de la ventana de manera segura"""
@@ -1491,6 +1837,10 @@ class DICOMViewer(QMainWindow):
         except Exception as e:
             print(f"Error durante el cierre: {str(e)}")
         
+        # Detener los trabajos y la carga en segundo plano
+        self.job_scheduler.shutdown()
+        self.stop_series_loading()
+
         # Llamar al método base para manejar el cierre de la ventana
         super().closeEvent(event)
 
@@ -1501,13 +1851,11 @@ class DICOMViewer(QMainWindow):
         """Obtiene los slices actualmente visibles en las vistas"""
         # Axial (no transformada previamente)
         current_axial = self.images[self.current_axial, :, :].copy()
-        
-        # Sagital y Coronal (ya transformadas)
 
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
+        # Sagital y Coronal (preparadas por el reslicer con calidad completa)
+        current_sagittal = self.reslicer.get("sagittal", self.current_sagittal).copy()
+        current_coronal = self.reslicer.get("coronal", self.current_coronal).copy()
 
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
-        
         return current_axial, current_sagittal, current_coronal
 
     def apply_transform(self):
@@ -1530,19 +1878,16 @@ class DICOMViewer(QMainWindow):
         
         transform_type = checked_button.text()
         
-        try:
-            if transform_type == "Rotación":
-                # Aplicamos rotación a las imágenes ya transformadas
-                self.transformed_axial, self.transformed_sagittal, self.transformed_coronal = self.apply_rotation(current_axial, current_sagittal, current_coronal)
-            elif transform_type == "Traslación":
-                self.transformed_axial, self.transformed_sagittal, self.transformed_coronal = (self.apply_translation(current_axial, current_sagittal, current_coronal))
-            elif transform_type == "Escalamiento":
-                self.transformed_axial, self.transformed_sagittal, self.transformed_coronal = (self.apply_scaling(current_axial, current_sagittal, current_coronal))
-            elif transform_type == "Inclinación":
-                self.transformed_axial, self.transformed_sagittal, self.transformed_coronal = (self.apply_shearing(current_axial, current_sagittal, current_coronal))
-            self.display_transformed_slices()
-        finally:
-            self.hide_status_bar()
+        # Cada transformación se calcula en segundo plano y se muestra al terminar
+        if transform_type == "Rotación":
+            # Aplicamos rotación a las imágenes ya transformadas
+            self.apply_rotation(current_axial, current_sagittal, current_coronal)
+        elif transform_type == "Traslación":
+            self.apply_translation(current_axial, current_sagittal, current_coronal)
+        elif transform_type == "Escalamiento":
+            self.apply_scaling(current_axial, current_sagittal, current_coronal)
+        elif transform_type == "Inclinación":
+            self.apply_shearing(current_axial, current_sagittal, current_coronal)
 
     def display_transformed_slices(self):
         """Muestra los slices transformados en las vistas correspondientes"""
@@ -1558,56 +1903,102 @@ class DICOMViewer(QMainWindow):
             # La coronal ya fue transformada en apply_rotation
             self.display_slice(self.transformed_coronal, self.coronal_renderer, self.coronal_vtk_widget)
 
+    def run_job(self, tasks, on_done, name="trabajo"):
+        """Ejecuta las tareas en segundo plano y entrega sus resultados a on_done en el hilo de la interfaz; devuelve el id del trabajo"""
+        self.show_status_bar("Cargando...")
+        self.batch_running = False  # Un trabajo nuevo reemplaza al lote en curso
 
-    # Aplicar Rotación
-    def apply_rotation(self, axial_slice, sagittal_slice, coronal_slice):
-        """Aplica rotación a las imágenes ya transformadas sin usar funciones especializadas"""
-        angle_deg = self.angle_input.value()
-        
-        def rotate_image(img_array, angle_degrees):
-            angle = -np.radians(angle_degrees)  # signo negativo para rotar en sentido horario
-            cos_theta = np.cos(angle)
-            sin_theta = np.sin(angle)
+        def finish(results):
+            try:
+                on_done(results)
+            finally:
+                self.hide_status_bar()
 
-            T = np.array([
-                [cos_theta, -sin_theta],
-                [sin_theta,  cos_theta]
-            ])
+        return self.job_scheduler.submit(tasks, finish, self.show_job_error, name)
 
-            h, w = img_array.shape
+    def process_views(self, kernel, slices, name="vistas"):
+        """Aplica kernel a cada vista en paralelo y muestra los resultados al terminar"""
+        if self.batch_checkbox.isChecked():
+            self.process_volume(batch.per_slice(kernel), name)
+            return
+        self.run_job([partial(kernel, image) for image in slices], self.show_view_results, name)
+
+    def process_volume(self, chunk_kernel, name="vistas"):
+        """
+        Aplica chunk_kernel a todos los cortes del eje elegido en bloques paralelos.
+
+        El resultado se guarda como volumen derivado que recorre el slider de ese eje.
+        """
+        # Durante la carga el volumen aún tiene cortes sin decodificar y el rango de valores es provisional
+        if self.is_series_loading():
+            QMessageBox.warning(self, "Advertencia",
+                                "La serie aún se está cargando; espera a que termine para procesar el volumen completo.")
+            return
+        axis = self.batch_axes[self.batch_axis_combo.currentText()]
+        get_slice, n_slices = batch.slice_source(self.images, axis, self.reslicer)
+        output = batch.BatchOutput(n_slices)
+        tasks = batch.chunk_tasks(chunk_kernel, get_slice, n_slices, output)
+        start = time.perf_counter()
+
+        def finish(results):
+            self.batch_running = False
+            elapsed = time.perf_counter() - start
+            throughput = n_slices / elapsed
+            print(f"Lote {axis}: {n_slices} cortes en {elapsed:.2f} s ({throughput:.1f} cortes/s)")
+
+            self.derived_volume = (axis, output.volume)
+            if axis == "axial":
+                self.update_axial_view()
+            elif axis == "sagittal":
+                self.update_sagittal_view()
+            else:
+                self.update_coronal_view()
 
-            corners = np.array([
-                [0, 0],
-                [0, w],
-                [h, 0],
-                [h, w]
-            ])
-            rotated_corners = np.dot(corners, T.T)
-            min_coords = rotated_corners.min(axis=0)
-            max_coords = rotated_corners.max(axis=0)
+            self.show_status_bar(f"{throughput:.1f} CORTES/S")
+            self.status_bar_timer.start(4000)
+
+        def fail(message):
+            self.batch_running = False
+            self.show_job_error(message)
 
-            new_h = int(np.ceil(max_coords[0] - min_coords[0]))
-            new_w = int(np.ceil(max_coords[1] - min_coords[1]))
+        self.show_status_bar(f"PROCESANDO {n_slices} CORTES...")
+        self.job_scheduler.submit(tasks, finish, fail, f"lote.{name}")
+        self.batch_running = True
 
-            rotated_img = np.full((new_h, new_w), self.borders[0], dtype=img_array.dtype)
+    def derived_slice(self, axis, index):
+        """Corte index del volumen derivado si el último lote se hizo sobre ese eje; si no, None"""
+        if self.derived_volume is None or self.derived_volume[0] != axis:
+            return None
+        return self.derived_volume[1][index]
+
+    def show_view_results(self, results):
+        """Guarda y muestra los resultados (axial, sagital, coronal) de un trabajo"""
+        self.transformed_axial, self.transformed_sagittal, self.transformed_coronal = results
+        self.display_transformed_slices()
 
-            offset = -min_coords
+    def show_job_error(self, message):
+        """Informa de un error ocurrido en un trabajo en segundo plano"""
+        self.hide_status_bar()
+        print(f"Error al procesar las imágenes:\n{message}")
+        QMessageBox.critical(self, "Error", f"Error al procesar las imágenes:\n{message.strip().splitlines()[-1]}")
+
+    def cancel_pending_job(self):
+        """Cancela el trabajo en curso, cuyos resultados ya no corresponden a las vistas"""
+        # Un lote de volumen completo no depende del corte visible, así que sigue en curso
+        if self.job_scheduler.is_busy() and not self.batch_running:
+            self.job_scheduler.cancel()
+            self.hide_status_bar()
 
-            for y in range(h):
-                for x in range(w):
-                    new_coords = np.dot(T, np.array([y, x])) + offset
-                    new_y, new_x = np.round(new_coords).astype(int)
-                    if 0 <= new_y < new_h and 0 <= new_x < new_w:
-                        rotated_img[new_y, new_x] = img_array[y, x]
 
-            return rotated_img
+    # Aplicar Rotación
+    def apply_rotation(self, axial_slice, sagittal_slice, coronal_slice):
+        """Aplica rotación horaria a los slices actuales según el ángulo especificado (geometry.rotate)"""
+        angle_deg = self.angle_input.value()
+        fill_value = self.borders[0]
         
         # Rotar cada slice
-        rotated_axial = rotate_image(axial_slice, angle_deg)
-        rotated_sagittal = rotate_image(sagittal_slice, angle_deg)
-        rotated_coronal = rotate_image(coronal_slice, angle_deg)
-        
-        return rotated_axial, rotated_sagittal, rotated_coronal
+        self.process_views(lambda img: geometry.rotate(img, angle_deg, fill_value),
+                           (axial_slice, sagittal_slice, coronal_slice), "rotacion")
 
 
     # Aplicar Traslación
@@ -1615,134 +2006,30 @@ class DICOMViewer(QMainWindow):
         """Aplica traslación a los slices actuales según los valores especificados"""
         dx = self.h_translation_input.value()
         dy = self.v_translation_input.value()
-            
-        def translate_slice(img_array, tx_h, theta):
-            h, w = img_array.shape
-
-            # Imagen de salida del mismo tamaño que la original, con relleno en -1000
-            translated_img = np.full((h, w), self.borders[0], dtype=img_array.dtype)
-
-            for y in range(h):
-                for x in range(w):
-                    new_y = int(y + tx_h)
-                    new_x = int(x + theta)
-                    # Solo asigna si la nueva posición cae dentro de la imagen de salida
-                    if 0 <= new_y < h and 0 <= new_x < w:
-                        translated_img[new_y, new_x] = img_array[y, x]
-
-            return translated_img
-        
-        translated_axial = translate_slice(axial_slice, dy, dx)
-        translated_sagittal = translate_slice(sagittal_slice, dy, dx)
-        translated_coronal = translate_slice(coronal_slice, dy, dx)
+        fill_value = self.borders[0]
         
-        return translated_axial, translated_sagittal, translated_coronal
+        self.process_views(lambda img: geometry.translate(img, dy, dx, fill_value),
+                           (axial_slice, sagittal_slice, coronal_slice), "traslacion")
     
     
     def apply_scaling(self, axial_slice, sagittal_slice, coronal_slice):
         """Aplica escalamiento a los slices actuales según los factores especificados"""
         scale_x = self.h_scaling_input.value()
         scale_y = self.v_scaling_input.value()
+        fill_value = self.borders[0]
 
-
-        def bilinear_interpolation(img_array):
-            """ Rellena los valores -1000 en la imagen usando interpolación bilineal """
-            h, w = img_array.shape
-            for y in range(1, h - 1):
-                for x in range(1, w - 1):
-                    if img_array[y, x] == -1000:  # Si el píxel está vacío
-                        vecinos = []
-                        for dy in [-1, 0, 1]:
-                            for dx in [-1, 0, 1]:
-                                ny, nx = y + dy, x + dx
-                                if 0 <= ny < h and 0 <= nx < w and img_array[ny, nx] != -1000:
-                                    vecinos.append(img_array[ny, nx])
-                        if vecinos:
-                            img_array[y, x] = np.mean(vecinos)  # Promedio de vecinos válidos
-
-            return img_array
-        
-        def scale_slice(img_array, scale_y, scale_x):
-            h, w = img_array.shape
-
-            # Nuevas dimensiones según los factores de escala
-            new_h = round(h * scale_y)
-            new_w = round(w * scale_x)
-
-            # Inicializar la imagen escalada con -1000
-            scaled_img = np.full((new_h, new_w), self.borders[0], dtype=img_array.dtype)
-
-            # Escalado directo
-            for y in range(h):
-                for x in range(w):
-                    new_y = round(y * scale_y)
-                    new_x = round(x * scale_x)
-                    if 0 <= new_y < new_h and 0 <= new_x < new_w:
-                        scaled_img[new_y, new_x] = img_array[y, x]
-
-            return scaled_img
-        
-        scaled_axial = bilinear_interpolation(scale_slice(axial_slice, scale_y, scale_x))
-        scaled_sagittal = bilinear_interpolation(scale_slice(sagittal_slice, scale_y, scale_x))
-        scaled_coronal = bilinear_interpolation(scale_slice(coronal_slice, scale_y, scale_x))
-        
-        return scaled_axial, scaled_sagittal, scaled_coronal
+        # Remuestreo bilineal sobre un lienzo del tamaño de la imagen escalada: no quedan huecos que rellenar
+        self.process_views(lambda img: geometry.scale(img, scale_y, scale_x, fill_value),
+                           (axial_slice, sagittal_slice, coronal_slice), "escalamiento")
 
     def apply_shearing(self, axial_slice, sagittal_slice, coronal_slice):
         """Aplica inclinación a los slices actuales según los factores especificados"""
         shear_x = self.h_shearing_input.value()
         shear_y = self.v_shearing_input.value()
+        fill_value = self.borders[0]
         
-        def shear_slice(img_array, shear_y_deg, shear_x_deg):
-            h, w = img_array.shape
-
-            # Convertir ángulos a radianes
-            shear_y = np.tan(np.radians(shear_y_deg))
-            shear_x = np.tan(np.radians(shear_x_deg))
-
-            # Matriz de proyección (shear)
-            H = np.array([
-                [1, shear_y, 0],
-                [shear_x, 1, 0],
-                [0, 0, 1]
-            ])
-
-            # Esquinas de la imagen para determinar tamaño necesario
-            corners = np.array([
-                [0, 0, 1],
-                [0, w, 1],
-                [h, 0, 1],
-                [h, w, 1]
-            ])
-            projected = np.dot(H, corners.T).T
-            max_y, max_x = projected[:, 0].max(), projected[:, 1].max()
-            min_y, min_x = projected[:, 0].min(), projected[:, 1].min()
-
-            new_h = int(np.ceil(max_y - min_y))
-            new_w = int(np.ceil(max_x - min_x))
-
-            # Imagen de salida inicializada
-            projected_img = np.full((new_h, new_w), self.borders[0], dtype=img_array.dtype)
-
-            offset_y = -int(np.floor(min_y))
-            offset_x = -int(np.floor(min_x))
-
-            for y in range(h):
-                for x in range(w):
-                    original_coord = np.array([y, x, 1])
-                    new_coord = H @ original_coord
-                    new_y, new_x = np.round(new_coord[0] + offset_y), np.round(new_coord[1] + offset_x)
-                    new_y, new_x = int(new_y), int(new_x)
-                    if 0 <= new_y < new_h and 0 <= new_x < new_w:
-                        projected_img[new_y, new_x] = img_array[y, x]
-
-            return projected_img
-        
-        sheared_axial = shear_slice(axial_slice, shear_y , shear_x)
-        sheared_sagittal = shear_slice(sagittal_slice, shear_y , shear_x)
-        sheared_coronal = shear_slice(coronal_slice, shear_y , shear_x)
-        
-        return sheared_axial, sheared_sagittal, sheared_coronal
+        self.process_views(lambda img: geometry.shear(img, shear_y, shear_x, fill_value),
+                           (axial_slice, sagittal_slice, coronal_slice), "inclinacion")
     #=====================================================================================================
 
     #==========================================MODIFICAION DE RESOLUCION==================================
@@ -1824,6 +2111,11 @@ class DICOMViewer(QMainWindow):
         
         layout.addWidget(QLabel("No. de Bits:"))
         layout.addWidget(self.bits_input)
+
+        # Rango de cuantización: el del volumen completo (mismos niveles en todos los cortes) o el de cada corte
+        self.global_range_checkbox = QCheckBox("Rango global del volumen")
+        self.global_range_checkbox.setEnabled(False)
+        layout.addWidget(self.global_range_checkbox)
         parent_layout.addWidget(container)
 
     def create_temporal_resolution_group(self, parent_layout):
@@ -1852,8 +2144,16 @@ class DICOMViewer(QMainWindow):
         
         # Controles
         self.movement_combo = QComboBox()
-        self.movement_combo.addItems(["Movimiento Vertical", "Movimiento Horizontal"])
+        self.movement_combo.addItems(["Movimiento Vertical", "Movimiento Horizontal", "Movimiento Angular"])
         self.movement_combo.setEnabled(False)
+        self.movement_combo.currentTextChanged.connect(self.update_resolution_controls)
+
+        self.movement_angle_input = QSpinBox()
+        self.movement_angle_input.setRange(0, 179)
+        self.movement_angle_input.setValue(45)
+        self.movement_angle_input.setSingleStep(15)
+        self.movement_angle_input.setSuffix("°")
+        self.movement_angle_input.setEnabled(False)  # Solo para movimiento angular
         
         self.movement_intensity_input = QSpinBox()  # Cambiar a QSpinBox
         self.movement_intensity_input.setRange(0, 100)  # Rango de 0 a 100
@@ -1868,6 +2168,8 @@ class DICOMViewer(QMainWindow):
         controls_layout.addWidget(self.movement_combo)
         controls_layout.addWidget(QLabel("Intensidad:"))
         controls_layout.addWidget(self.movement_intensity_input)
+        controls_layout.addWidget(QLabel("Ángulo:"))
+        controls_layout.addWidget(self.movement_angle_input)
         
         layout.addLayout(controls_layout)
         parent_layout.addWidget(container)
@@ -1884,8 +2186,10 @@ class DICOMViewer(QMainWindow):
         self.sampling_combo.setEnabled(False)
         self.percentage_input.setEnabled(False)
         self.bits_input.setEnabled(False)
+        self.global_range_checkbox.setEnabled(False)
         self.movement_combo.setEnabled(False)
         self.movement_intensity_input.setEnabled(False)
+        self.movement_angle_input.setEnabled(False)
         
         # Habilitar los controles correspondientes a la opción seleccionada
         if selected_rb == self.spatial_resolution_rb:
@@ -1893,9 +2197,11 @@ class DICOMViewer(QMainWindow):
             self.percentage_input.setEnabled(True)
         elif selected_rb == self.radiometric_resolution_rb:
             self.bits_input.setEnabled(True)
+            self.global_range_checkbox.setEnabled(True)
         elif selected_rb == self.temporal_resolution_rb:
             self.movement_combo.setEnabled(True)
             self.movement_intensity_input.setEnabled(True)
+            self.movement_angle_input.setEnabled(self.movement_combo.currentText() == "Movimiento Angular")
 
     def apply_resolution_changes(self):
         self.show_status_bar("Cargando...")
@@ -1908,82 +2214,34 @@ class DICOMViewer(QMainWindow):
         
         selected_rb = self.resolution_options.checkedButton()
         
-        try:
-            if selected_rb == self.spatial_resolution_rb:
-                sampling_type = self.sampling_combo.currentText()
-                percentage = self.percentage_input.value()
-                self.apply_spatial_resolution(sampling_type, percentage)
-                
-            elif selected_rb == self.radiometric_resolution_rb:
-                # Aplicar cambios de resolución radiométrica
-                bits = self.bits_input.value()
-                self.apply_radiometric_resolution(bits)
-                
-            elif selected_rb == self.temporal_resolution_rb:
-                # Aplicar cambios de resolución temporal
-                movement_type = self.movement_combo.currentText()
-                intensity = self.movement_intensity_input.value()
-                self.apply_temporal_resolution(movement_type, intensity)
-        finally:
+        # Los cambios se calculan en segundo plano; la barra de estado se oculta al terminar
+        if selected_rb == self.spatial_resolution_rb:
+            sampling_type = self.sampling_combo.currentText()
+            percentage = self.percentage_input.value()
+            self.apply_spatial_resolution(sampling_type, percentage)
+            
+        elif selected_rb == self.radiometric_resolution_rb:
+            # Aplicar cambios de resolución radiométrica
+            bits = self.bits_input.value()
+            self.apply_radiometric_resolution(bits)
+            
+        elif selected_rb == self.temporal_resolution_rb:
+            # Aplicar cambios de resolución temporal
+            movement_type = self.movement_combo.currentText()
+            intensity = self.movement_intensity_input.value()
+            self.apply_temporal_resolution(movement_type, intensity)
+        else:
             self.hide_status_bar()
 
     def apply_spatial_resolution(self, sampling_type, percentage):
         """Aplica submuestreo o sobremuestreo a las imágenes visibles"""
 
         # Obtener slices actuales
-        current_axial = self.images[self.current_axial, :, :].copy()
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
-
-        def resample_image(img_array, sampling_type, percentage):
-
-            h, w = img_array.shape
-
-            if sampling_type == "Submuestreo":
-                factor = 1 + (percentage / 100) * 10
-                factor = int(np.clip(round(factor), 1, min(h, w)))
-                reduced = img_array[::factor, ::factor]
-                return reduced
-
-            elif sampling_type == "Sobremuestreo":
-                scale = 1 + (percentage / 100)  # 0.3 → 1.3x
-
-                new_h = int(h * scale)
-                new_w = int(w * scale)
-
-                # Crear la nueva imagen vacía
-                resized = np.zeros((new_h, new_w), dtype=np.float32)
-
-                # Coordenadas en la imagen original
-                row_idx = np.linspace(0, h - 1, new_h)
-                col_idx = np.linspace(0, w - 1, new_w)
-
-                for i, y in enumerate(row_idx):
-                    y0 = int(np.floor(y))
-                    y1 = min(y0 + 1, h - 1)
-                    wy = y - y0
-
-                    for j, x in enumerate(col_idx):
-                        x0 = int(np.floor(x))
-                        x1 = min(x0 + 1, w - 1)
-                        wx = x - x0
-
-                        # Interpolación bilineal
-                        top = (1 - wx) * img_array[y0, x0] + wx * img_array[y0, x1]
-                        bottom = (1 - wx) * img_array[y1, x0] + wx * img_array[y1, x1]
-                        interpolated = (1 - wy) * top + wy * bottom
-
-                        resized[i, j] = interpolated
-
-                return resized
-
-        # Aplicar la resolución espacial a cada slice
-        self.transformed_axial = resample_image(current_axial, sampling_type, percentage)
-        self.transformed_sagittal = resample_image(current_sagittal, sampling_type, percentage)
-        self.transformed_coronal = resample_image(current_coronal, sampling_type, percentage)
+        current_axial, current_sagittal, current_coronal = self.get_current_slices()
 
-        # Mostrar los resultados
-        self.display_transformed_slices()
+        # Aplicar la resolución espacial a cada slice y mostrar los resultados
+        self.process_views(lambda img: resolution.resample_image(img, sampling_type, percentage),
+                           (current_axial, current_sagittal, current_coronal), "resolucion_espacial")
 
     def display_transformed_slices(self):
         """Muestra los slices transformados en las vistas correspondientes"""
@@ -2004,39 +2262,20 @@ class DICOMViewer(QMainWindow):
             return
         
         # Obtener los slices actuales (similar a transformación de coordenadas)
-        current_axial = self.images[self.current_axial, :, :].copy()
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
-        
-        def reduce_bit_depth(image, bits):
-            """Reduce la profundidad de bits de la imagen"""
-            if bits >= 16:
-                return image  # No hacer nada si ya es 16 bits o más
-            
-            # Normalizar a [0,1], aplicar reducción de bits, y volver a escala original
-            min_val = image.min()
-            max_val = image.max()
-            
-            if max_val == min_val:  # Evitar división por cero
-                return image
-            
-            # Normalizar
-            normalized = (image - min_val) / (max_val - min_val)
-            
-            # Reducir bits
-            max_val_reduced = (1 << bits) - 1
-            reduced = np.round(normalized * max_val_reduced) / max_val_reduced
-            
-            # Volver a la escala original
-            return reduced * (max_val - min_val) + min_val
-        
-        # Aplicar reducción de bits a cada slice
-        self.transformed_axial =reduce_bit_depth(current_axial, bits)
-        self.transformed_sagittal =reduce_bit_depth(current_sagittal, bits)
-        self.transformed_coronal =reduce_bit_depth(current_coronal, bits)
+        current_axial, current_sagittal, current_coronal = self.get_current_slices()
         
-        # Mostrar los resultados
-        self.display_transformed_slices()
+        value_range = self.borders if self.global_range_checkbox.isChecked() else None
+
+        if self.batch_checkbox.isChecked():
+            # Cada bloque se cuantiza con una sola LUT (rango global) o con una por corte
+            self.process_volume(lambda chunk: quantization.quantize_volume(np.stack(chunk), bits, value_range,
+                                                                           per_slice=value_range is None),
+                                "resolucion_radiometrica")
+            return
+
+        # Aplicar reducción de bits a cada slice y mostrar los resultados
+        self.process_views(lambda img: resolution.reduce_bit_depth(img, bits, value_range),
+                           (current_axial, current_sagittal, current_coronal), "resolucion_radiometrica")
 
 
     # Aplicar Resolución Temporal --------------------------------------------------
@@ -2046,55 +2285,21 @@ class DICOMViewer(QMainWindow):
             return
 
         # Obtener slices actuales
-        current_axial = self.images[self.current_axial, :, :].copy()
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
-
-        def apply_temporal_motion(img_array, motion_strength, is_vertical):
-
-            motion_strength = motion_strength / 100.0  # Convertir a rango [0, 1]
-            """
-            Aplica desenfoque por movimiento simulado sin alterar la escala de intensidades DICOM.
-            """
-            img = img_array.astype(np.float32)
-            h, w = img.shape
-
-            def get_normalized_toeplitz_vector(size, strength):
-                if strength <= 0.0:
-                    return np.zeros(size)
-
-                n = np.arange(0.01, 3.01, 0.01)
-                t = np.exp(-n / (strength ** 2))
-                t_sum = t.sum()
-
-                if t_sum == 0:  # evitar división por cero
-                    return np.zeros(size)
-
-                t /= t_sum
-                vec = np.zeros(size)
-                vec[:len(t)] = t
-                return vec
-
-            if is_vertical:
-                vec = get_normalized_toeplitz_vector(h, motion_strength)
-                move = toeplitz(vec) if motion_strength > 0 else np.eye(h, dtype=np.float32)
-                result = move @ img
-            else:
-                vec = get_normalized_toeplitz_vector(w, motion_strength)
-                move = toeplitz(vec) if motion_strength > 0 else np.eye(w, dtype=np.float32)
-                result = img @ move
-
-            return result  # Misma escala que la imagen original
+        current_axial, current_sagittal, current_coronal = self.get_current_slices()
 
         # Determinar el tipo de movimiento
         is_vertical = movement_type == "Movimiento Vertical"
+        angle = self.movement_angle_input.value() if movement_type == "Movimiento Angular" else None
 
-        # Aplicar blur de movimiento
-        self.transformed_axial = apply_temporal_motion(current_axial, intensity, is_vertical)
-        self.transformed_sagittal = apply_temporal_motion(current_sagittal, intensity, is_vertical)
-        self.transformed_coronal = apply_temporal_motion(current_coronal, intensity, is_vertical)
+        if self.batch_checkbox.isChecked():
+            # Cada bloque de cortes se desenfoca como una pila (mismo kernel para todos)
+            self.process_volume(lambda chunk: resolution.apply_temporal_motion(np.stack(chunk), intensity, is_vertical, angle),
+                                "resolucion_temporal")
+            return
 
-        self.display_transformed_slices()
+        # Aplicar blur de movimiento
+        self.process_views(lambda img: resolution.apply_temporal_motion(img, intensity, is_vertical, angle),
+                           (current_axial, current_sagittal, current_coronal), "resolucion_temporal")
 
     
     #=====================================================================================================
@@ -2106,157 +2311,41 @@ class DICOMViewer(QMainWindow):
         """Aplica el filtro frecuencial a la imagen actual según los parámetros seleccionados."""
         if self.images is None:
             QMessageBox.warning(self, "Advertencia", "No hay imágenes cargadas para filtrar.")
+            self.hide_status_bar()
             return
         
 
         # Obtener slices actuales
-        current_axial = self.images[self.current_axial, :, :].copy()
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
+        current_axial, current_sagittal, current_coronal = self.get_current_slices()
 
 
         # Obtener parámetros del filtro
         filter_name = self.frequency_window_combo.currentText()
         filter_type = "low" if self.frequency_type_combo.currentText() == "Pasa Bajas" else "high"
         sigma = self.frequency_radius_dimension_input.value()
+        border_factor = self.frequency_input.value()
 
+        if self.batch_checkbox.isChecked():
+            # Cada bloque de cortes se filtra con una sola transformada apilada
+            self.process_volume(lambda chunk: frequency.filter_slices(chunk, filter_type, filter_name, sigma, border_factor),
+                                "filtro_frecuencial")
+            return
 
-        def apply_frequency_filter(image, filter_type, filter_name, sigma, K=0.0001, n=2):
-            K = sigma
-            n = 2
-            border_factor = self.frequency_input.value()
-            M, N = image.shape
-            #H = np.zeros((M, N))
-            #H = np.full((M, N), self.borders[0], dtype=np.float32)
-            H = np.zeros((M, N), dtype=np.float32)
-
-            for h in range(M):
-                dx = (h - M / 2) / (M / 2)
-                for k in range(N):
-                    dy = (k - N / 2) / (N / 2)
-                    dxy = np.sqrt(dx**2 + dy**2)
-
-                    if filter_name == "Coseno":
-                        if abs(dx) < sigma and abs(dy) < sigma:
-                            H[h, k] = np.cos((np.pi * dx) / (2 * sigma)) * np.cos((np.pi * dy) / (2 * sigma))
-                    elif filter_name == "Gaussiana Mod":
-                        H[h, k] = np.exp(-(dxy**n) / K)
-                    elif filter_name == "Barlett":
-                        if 0 <= dxy / sigma <= 1:
-                            H[h, k] = 1 - (dxy / sigma)
-                    elif filter_name == "Hanning":
-                        if dxy / sigma < np.pi and dxy < sigma:
-                            H[h, k] = 0.5 * (np.cos((np.pi * dxy) / sigma) + 1)
-                    elif filter_name == "Gaussiana":
-                        H[h, k] = np.exp(-(dxy**2) / (2 * sigma**2))
-                    elif filter_name == "Rectangular":
-                        if dxy < sigma:
-                            H[h, k] = 1
-                    else:
-                        raise ValueError(f"Filtro '{filter_name}' no reconocido.")
-
-            if filter_type == "high":
-                H = 1 - H
-                H *= border_factor
-
-            else:
-                H = H ** border_factor
-                
-
-            return H
-        
-        def filter_image(image, H):
-            F = fftshift(fft2(image))
-            G = F * H
-            img_filtered = np.real(ifft2(ifftshift(G)))
-            return img_filtered
-
-
-        # Aplicar el filtro
-        transformed_axial = apply_frequency_filter(current_axial, filter_type,filter_name, sigma)
-        transformed_sagittal = apply_frequency_filter(current_sagittal, filter_type,filter_name, sigma)
-        transformed_coronal = apply_frequency_filter(current_coronal, filter_type,filter_name, sigma)
-
-        self.transformed_axial = filter_image(current_axial, transformed_axial)
-        self.transformed_sagittal = filter_image(current_sagittal, transformed_sagittal)
-        self.transformed_coronal = filter_image(current_coronal, transformed_coronal)
-
-
-
-        # Mostrar resultados
-        self.display_transformed_slices()
+        # Filtrar las tres vistas en lote con transformadas reales (un solo trabajo, FFT multihilo)
+        slices = [current_axial, current_sagittal, current_coronal]
+        self.run_job([lambda: frequency.filter_slices(slices, filter_type, filter_name, sigma, border_factor)],
+                     lambda results: self.show_view_results(results[0]), "filtro_frecuencial")
 
     def apply_spatial_filter_to_current_image(self):
         """Aplica el filtro espacial a la imagen actual según los parámetros seleccionados."""
         if self.images is None:
             QMessageBox.warning(self, "Advertencia", "No hay imágenes cargadas para filtrar.")
+            self.hide_status_bar()
             return
         
         
         # Obtener slices actuales
-        current_axial = self.images[self.current_axial, :, :].copy()
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
-
-        
-
-
-        def apply_spatial_filter(image, filter_type, filter_name, factor=1.0, kernel_size=3):
-
-        
-            if filter_type == "low":
-                # Filtro pasabajos (suavizado)
-                kernel = np.ones((kernel_size, kernel_size), dtype=np.float32) / (kernel_size ** 2)
-                filtered = convolve2d(image, kernel, mode='same', boundary='symm')
-                
-                # Mezcla con la imagen original para controlar el efecto
-                # factor=1: solo filtro, factor=0: solo imagen original
-                filtered = factor * filtered + (1 - factor) * image
-                
-            elif filter_type == "high":
-                kernels = {
-                    # Sobel (8 direcciones)
-                    "Sobel-N":    np.array([[ 1,  2,  1], [ 0,  0,  0], [-1, -2, -1]]),
-                    "Sobel-NE":   np.array([[ 0,  1,  2], [-1,  0,  1], [-2, -1,  0]]),
-                    "Sobel-E":    np.array([[-1,  0,  1], [-2,  0,  2], [-1,  0,  1]]),
-                    "Sobel-SE":   np.array([[-2, -1,  0], [-1,  0,  1], [ 0,  1,  2]]),
-                    "Sobel-S":    np.array([[-1, -2, -1], [ 0,  0,  0], [ 1,  2,  1]]),
-                    "Sobel-SW":   np.array([[ 0, -1, -2], [ 1,  0, -1], [ 2,  1,  0]]),
-                    "Sobel-W":    np.array([[ 1,  0, -1], [ 2,  0, -2], [ 1,  0, -1]]),
-                    "Sobel-NW":   np.array([[ 2,  1,  0], [ 1,  0, -1], [ 0, -1, -2]]),
-                    
-                    # Prewitt (8 direcciones)
-                    "Prewitt-N":  np.array([[ 1,  1,  1], [ 0,  0,  0], [-1, -1, -1]]),
-                    "Prewitt-NE": np.array([[ 0,  1,  1], [-1,  0,  1], [-1, -1,  0]]),
-                    "Prewitt-E":  np.array([[-1,  0,  1], [-1,  0,  1], [-1,  0,  1]]),
-                    "Prewitt-SE": np.array([[-1, -1,  0], [-1,  0,  1], [ 0,  1,  1]]),
-                    "Prewitt-S":  np.array([[-1, -1, -1], [ 0,  0,  0], [ 1,  1,  1]]),
-                    "Prewitt-SW": np.array([[ 0, -1, -1], [ 1,  0, -1], [ 1,  1,  0]]),
-                    "Prewitt-W":  np.array([[ 1,  0, -1], [ 1,  0, -1], [ 1,  0, -1]]),
-                    "Prewitt-NW": np.array([[ 1,  1,  0], [ 1,  0, -1], [ 0, -1, -1]]),
-                    
-                    # Laplace (3 variantes)
-                    "Laplace":    np.array([[ 0,  1,  0], [ 1, -4,  1], [ 0,  1,  0]]),
-                    "Laplace-8":  np.array([[ 1,  1,  1], [ 1, -8,  1], [ 1,  1,  1]]),
-                    "Laplace-D":  np.array([[ 1,  0,  1], [ 0, -4,  0], [ 1,  0,  1]])
-                }
-
-                if filter_name not in kernels:
-                    raise ValueError(f"Filtro no reconocido: {filter_name}")
-                    
-                kernel = kernels[filter_name]
-                filtered = convolve2d(image, kernel, mode='same', boundary='symm')
-                
-                # Aplicar factor de intensidad
-                filtered = filtered * factor
-                
-                
-            else:
-                raise ValueError("Tipo de filtro inválido (usa 'low' o 'high')")
-
-
-            return filtered
-        
+        current_axial, current_sagittal, current_coronal = self.get_current_slices()
 
         #Obtener parámetros del filtro
         filter_name = self.spatial_window_combo.currentText()
@@ -2264,12 +2353,16 @@ class DICOMViewer(QMainWindow):
         kernel_size = self.kernel_size_input.value()
         factor = self.spatial_input.value()
         
-        self.transformed_axial = apply_spatial_filter(current_axial, filter_type, filter_name, factor, kernel_size)
-        self.transformed_sagittal = apply_spatial_filter(current_sagittal, filter_type, filter_name, factor, kernel_size)
-        self.transformed_coronal = apply_spatial_filter(current_coronal, filter_type, filter_name, factor, kernel_size)
+        if self.batch_checkbox.isChecked():
+            # Cada bloque de cortes se convoluciona como una pila
+            self.process_volume(lambda chunk: filters.filter_slices(chunk, filter_type, filter_name, factor, kernel_size),
+                                "filtro_espacial")
+            return
 
-        # Mostrar resultados
-        self.display_transformed_slices()
+        # Filtrar cada vista en segundo plano y mostrar resultados
+        bank = self.edge_bank_checkbox.isChecked()
+        self.process_views(lambda img: filters.apply_spatial_filter(img, filter_type, filter_name, factor, kernel_size, bank),
+                           (current_axial, current_sagittal, current_coronal), "filtro_espacial")
         
         return
 
@@ -2279,12 +2372,11 @@ class DICOMViewer(QMainWindow):
         self.show_status_bar("Cargando...")
         QApplication.processEvents()  # Ensure UI updates immediately
         """Ejecuta las funciones de filtrado espacial y frecuencial según las opciones seleccionadas."""
-        try:
-            if self.frequency_domain_rb.isChecked():
-                self.apply_frequency_filter_to_current_image()
-            elif self.spatial_domain_rb.isChecked():
-                self.apply_spatial_filter_to_current_image()
-        finally:
+        if self.frequency_domain_rb.isChecked():
+            self.apply_frequency_filter_to_current_image()
+        elif self.spatial_domain_rb.isChecked():
+            self.apply_spatial_filter_to_current_image()
+        else:
             self.hide_status_bar()
 
     #=====================================================================================================
@@ -2305,190 +2397,125 @@ class DICOMViewer(QMainWindow):
 
         # Obtener parámetros de entrada
         dispersion_width = self.dispersion_width_input.value()
-        method = self.visualization_combo.currentText()
 
         # Obtener slices actuales
-        current_axial = self.images[self.current_axial, :, :].copy()
-        current_sagittal = self.prepare_sagittal_slice(self.images[:, :, self.current_sagittal])
-        current_coronal = self.prepare_coronal_slice(self.images[:, self.current_coronal, :])
-
-        def restaurar_imagen(imagen_original, tipo='LS', K=10, N0=0.1, alpha=0.1, m1=0.3):
-            """
-            Aplica un algoritmo de reconstrucción (LS, CLS, WCLS o BMR) a una imagen degradada.
-
-            Parámetros:
-            - imagen_original: ndarray 2D (imagen en escala de grises, normalizada entre 0 y 1)
-            - tipo: str, uno de 'LS', 'CLS', 'WCLS', 'BMR'
-            - K: int, ancho de la función de dispersión (matriz del sistema S)
-            - N0: float, varianza del ruido
-            - alpha: float, parámetro de regularización para CLS y WCLS
-            - m1: float, parámetro de ponderación para WCLS
-            """
-            if tipo not in ['LS', 'CLS', 'WCLS', 'BMR']:
-                raise ValueError("Tipo debe ser uno de: 'LS', 'CLS', 'WCLS', 'BMR'")
-
-            V = imagen_original
-            M, N = V.shape
-
-            # Generar ruido gaussiano
-            ruido = np.random.randn(M, N) * np.sqrt(N0)
-
-            # Construcción de la matriz S usando |sinc(x)|
-            a = np.zeros(M)
-            for i in range(1, 2 * (K // 2) + 1):
-                a[i] = abs(np.sinc(i / (K // 2)))
-            a[0] = 1
-            S = toeplitz(a)
-            S /= np.sum(S[M // 2, :])  # Normalización
-
-            # Imagen degradada
-            U = S @ V + ruido
-
-            # Estimaciones
-            if tipo == 'LS':
-                restaurada = np.linalg.inv(S.T @ S) @ S.T @ U
-
-            elif tipo == 'CLS':
-                restaurada = np.linalg.inv(S.T @ S + alpha * np.eye(M)) @ S.T @ U
-
-            elif tipo == 'WCLS':
-                Mu = (1 / N0) * np.eye(M)
-                b = np.zeros(M)
-                b[0], b[1] = 2, -1
-                Mv = toeplitz(b)
-                Mv[0, 0] = Mv[-1, -1] = 1
-                Mv = np.eye(M) + m1 * Mv
-                mv = np.linalg.inv(S.T @ S + alpha * np.eye(M)) @ S.T @ U
-                W = np.linalg.inv(S.T @ Mu @ S + alpha * Mv) @ S.T @ Mu
-                restaurada = mv + W @ (U - S @ mv)
-
-            elif tipo == 'BMR':
-                mv = np.linalg.inv(S.T @ S + alpha * np.eye(M)) @ S.T @ U
-                Rn = N0 * np.eye(M)
-                mean_v = np.mean(V)
-                Rv = (V - mean_v) @ (V - mean_v).T + 0.1 * np.eye(M)
-                Mu_BMR = np.linalg.inv(Rn)
-                Mv_BMR = np.linalg.inv(Rv)
-                W3 = np.linalg.inv(S.T @ Mu_BMR @ S + Mv_BMR) @ S.T @ Mu_BMR
-                restaurada = mv + W3 @ (U - S @ mv)
-
-            return restaurada, U
-        
-        def calcular_metricas(original, reconstruida):
-            """
-            Calcula PSNR, IOSNR, MAE y SSIM entre dos imágenes.
-            Normaliza ambas imágenes al rango [0, 1] antes de calcular las métricas.
-            """
-            norm = lambda img: (img - img.min()) / (img.max() - img.min()) if img.max() != img.min() else img
-            original_norm = norm(original)
-            reconstruida_norm = norm(reconstruida)
-
-            psnr_val = peak_signal_noise_ratio(original_norm, reconstruida_norm, data_range=1.0)
-            iosnr_val = 10 * np.log10(np.mean(original_norm**2) / np.mean((original_norm - reconstruida_norm)**2))
-            mae_val = np.mean(np.abs(original_norm - reconstruida_norm))
-            ssim_val = structural_similarity(original_norm, reconstruida_norm, data_range=1.0)
-
-            return np.array([psnr_val, iosnr_val, mae_val, ssim_val])
-
-
-
-
-        self.cls_axial, U_axial = restaurar_imagen(current_axial, tipo='CLS', K=int(dispersion_width), N0=0.1)
-        self.cls_sagital, U_sagital = restaurar_imagen(current_sagittal, tipo='CLS', K=int(dispersion_width), N0=0.1)
-        self.cls_coronal, U_coronal = restaurar_imagen(current_coronal, tipo='CLS', K=int(dispersion_width), N0=0.1)
-
-        self.wcls_axial, U_axial = restaurar_imagen(current_axial, tipo='WCLS', K=int(dispersion_width), N0=0.1)
-        self.wcls_sagital, U_sagital = restaurar_imagen(current_sagittal, tipo='WCLS', K=int(dispersion_width), N0=0.1)
-        self.wcls_coronal, U_coronal = restaurar_imagen(current_coronal, tipo='WCLS', K=int(dispersion_width), N0=0.1)
-
-        self.bmr_axial, U_axial = restaurar_imagen(current_axial, tipo='BMR', K=int(dispersion_width), N0=0.1)
-        self.bmr_sagital, U_sagital = restaurar_imagen(current_sagittal, tipo='BMR', K=int(dispersion_width), N0=0.1)
-        self.bmr_coronal, U_coronal = restaurar_imagen(current_coronal, tipo='BMR', K=int(dispersion_width), N0=0.1)
-
-        def actualizar_vistas(method):
-
-            print(f"Aplicando método: {method}")
-        
-            if method == "CLS":
-                self.transformed_axial = self.cls_axial
-                self.transformed_sagittal = self.cls_sagital
-                self.transformed_coronal = self.cls_coronal
-            elif method == "WCLS":
-                self.transformed_axial = self.wcls_axial
-                self.transformed_sagittal = self.wcls_sagital
-                self.transformed_coronal = self.wcls_coronal
-            elif method == "BMR":
-                self.transformed_axial = self.bmr_axial
-                self.transformed_sagittal = self.bmr_sagital
-                self.transformed_coronal = self.bmr_coronal
-            elif method == "Imagen Degradada":
-                self.transformed_axial = U_axial
-                self.transformed_sagittal = U_sagital
-                self.transformed_coronal = U_coronal
-            elif method == "Imagen Original":
-                self.transformed_axial = current_axial
-                self.transformed_sagittal = current_sagittal
-                self.transformed_coronal = current_coronal
-            else:
-                self.transformed_axial = current_axial
-                self.transformed_sagittal = current_sagittal
-                self.transformed_coronal = current_coronal
-
-        # Actualizar vistas según el método seleccionado
-        actualizar_vistas(method)
-
-        metricas_axial_cls = calcular_metricas(current_axial, self.cls_axial)
-        metricas_sagittal_cls = calcular_metricas(current_sagittal,self.cls_sagital )
-        metricas_coronal_cls = calcular_metricas(current_coronal,self.cls_coronal)
-
-        metricas_axial_wcls = calcular_metricas(current_axial, self.wcls_axial)
-        metricas_sagittal_wcls = calcular_metricas(current_sagittal, self.wcls_sagital)
-        metricas_coronal_wcls = calcular_metricas(current_coronal, self.wcls_coronal)
+        current_axial, current_sagittal, current_coronal = self.get_current_slices()
 
-        metricas_axial_bmr = calcular_metricas(current_axial, self.bmr_axial)
-        metricas_sagittal_bmr = calcular_metricas(current_sagittal, self.bmr_sagital)
-        metricas_coronal_bmr = calcular_metricas(current_coronal, self.bmr_coronal)
-        
+        K = int(dispersion_width)
+
+        if self.batch_checkbox.isChecked():
+            # En volumen completo solo se calcula el método seleccionado para visualizar
+            metodo = self.visualization_combo.currentText()
+            if metodo not in restoration.RESTORATION_TYPES and metodo != restoration_store.DEGRADED:
+                # "Imagen Original": no hay nada que calcular, se descarta el lote y se muestra el volumen de origen
+                self.job_scheduler.cancel()
+                self.batch_running = False
+                self.derived_volume = None
+                self.transformed_axial = self.transformed_sagittal = self.transformed_coronal = None
+                self.hide_status_bar()
+                self.update_all_views()
+                return
+            tipo = metodo
+            psf = self.psf_combo.currentText()
+            if metodo == restoration_store.DEGRADED:
+                chunk_kernel = lambda chunk: restoration.degradar(np.stack(chunk), K=K, N0=0.1, psf=psf)
+            elif tipo in deconvolution.FFT_RESTORATION_TYPES:
+                # Los métodos FFT degradan y restauran cada bloque de cortes como una pila
+                chunk_kernel = lambda chunk: deconvolution.restaurar_fft(
+                    restoration.degradar(np.stack(chunk), K=K, N0=0.1, psf=psf), tipo, K, mode=psf)
+            else:
+                chunk_kernel = batch.per_slice(
+                    lambda imagen: restoration.restaurar_imagen(imagen, tipo=tipo, K=K, N0=0.1, psf=psf)[0])
+            self.process_volume(chunk_kernel, "mejoramiento")
+            return
 
-        # Mostrar métricas en la tabla
-        def actualizar_tabla_metricas(fila_inicio, metricas_axial, metricas_sagittal, metricas_coronal):
-            """Actualiza las métricas en la tabla para un método específico."""
-            def crear_celda_centrada(valor):
-                """Crea un QTableWidgetItem con texto centrado."""
-                item = QTableWidgetItem(f"{valor}")
-                item.setTextAlignment(Qt.AlignCenter)
-                return item
+        # Las restauraciones se calculan al mostrar cada método (o al pedir sus métricas) y se memorizan
+        self.restoration_views = {"axial": current_axial, "sagital": current_sagittal, "coronal": current_coronal}
+        self.restoration_params = {"K": K, "N0": 0.1, "seed": restoration_store.DEFAULT_SEED,
+                                   "psf": self.psf_combo.currentText()}
+        self.clear_metrics_table()
+        self.hide_status_bar()
+        self.show_restoration(self.visualization_combo.currentText())
 
-            self.metrics_table.setItem(fila_inicio, 0, crear_celda_centrada(f"{metricas_axial[0]:.2f}"))
-            self.metrics_table.setItem(fila_inicio, 1, crear_celda_centrada(f"{metricas_sagittal[0]:.2f}"))
-            self.metrics_table.setItem(fila_inicio, 2, crear_celda_centrada(f"{metricas_coronal[0]:.2f}"))
+    def show_restoration(self, method):
+        """Muestra el método elegido en las tres vistas; si es una restauración, rellena también sus métricas"""
+        if self.restoration_views is None:
+            return
+        views = self.restoration_views
+        print(f"Aplicando método: {method}")
 
-            self.metrics_table.setItem(fila_inicio + 1, 0, crear_celda_centrada(f"{metricas_axial[1]:.2f}"))
-            self.metrics_table.setItem(fila_inicio + 1, 1, crear_celda_centrada(f"{metricas_sagittal[1]:.2f}"))
-            self.metrics_table.setItem(fila_inicio + 1, 2, crear_celda_centrada(f"{metricas_coronal[1]:.2f}"))
+        if method not in RESTORATION_METHODS and method != restoration_store.DEGRADED:
+            # Una restauración aún en curso ya no debe sustituir a las vistas de partida
+            self.cancel_pending_job()
+            self.transformed_axial, self.transformed_sagittal, self.transformed_coronal = views.values()
+            self.display_transformed_slices()
+            self.run_pending_metrics()
+            return
 
-            self.metrics_table.setItem(fila_inicio + 2, 0, crear_celda_centrada(f"{metricas_axial[2]:.4f}"))
-            self.metrics_table.setItem(fila_inicio + 2, 1, crear_celda_centrada(f"{metricas_sagittal[2]:.4f}"))
-            self.metrics_table.setItem(fila_inicio + 2, 2, crear_celda_centrada(f"{metricas_coronal[2]:.4f}"))
+        def restaurar_vista(view, imagen):
+            """Resultado (y métricas) de una vista, desde el almacén si ya se calculó (segundo plano)"""
+            restaurada = self.restoration_store.result(imagen, view, method, **self.restoration_params)
+            if method == restoration_store.DEGRADED:
+                return restaurada, None
+            return restaurada, self.restoration_store.metrics(imagen, view, method, **self.restoration_params)
+
+        def mostrar_resultados(resultados):
+            """Recibe los resultados de las tres vistas en el hilo de la interfaz"""
+            (self.transformed_axial, _), (self.transformed_sagittal, _), (self.transformed_coronal, _) = resultados
+            if method in RESTORATION_METHODS:
+                self.fill_metrics_column(method, [metricas for _, metricas in resultados])
+            self.display_transformed_slices()
+            self.run_pending_metrics()
 
-            self.metrics_table.setItem(fila_inicio + 3, 0, crear_celda_centrada(f"{metricas_axial[3]:.4f}"))
-            self.metrics_table.setItem(fila_inicio + 3, 1, crear_celda_centrada(f"{metricas_sagittal[3]:.4f}"))
-            self.metrics_table.setItem(fila_inicio + 3, 2, crear_celda_centrada(f"{metricas_coronal[3]:.4f}"))
+        self.restoration_job = self.run_job([partial(restaurar_vista, view, imagen) for view, imagen in views.items()],
+                                            mostrar_resultados, "mejoramiento")
 
-        # Actualizar métricas para CLS
-        actualizar_tabla_metricas(0, metricas_axial_cls, metricas_sagittal_cls, metricas_coronal_cls)
+    def request_restoration_metrics(self, row, column):
+        """Calcula las métricas del método de la columna pulsada sin cambiar las vistas"""
+        if self.restoration_views is None or column >= len(RESTORATION_METHODS):
+            return
+        method = RESTORATION_METHODS[column]
+        if method not in self.pending_metrics:
+            self.pending_metrics.append(method)
+
+        # No se reemplaza a la restauración en curso: las métricas pedidas se calculan al terminar
+        if self.restoration_job is None or not self.job_scheduler.is_current(self.restoration_job):
+            self.run_pending_metrics()
+
+    def run_pending_metrics(self):
+        """Calcula en un solo trabajo las métricas de todos los métodos pedidos"""
+        self.restoration_job = None
+        if self.restoration_views is None or not self.pending_metrics:
+            return
+        methods = list(self.pending_metrics)
+        params = self.restoration_params
 
-        # Actualizar métricas para WCLS
-        actualizar_tabla_metricas(4, metricas_axial_wcls, metricas_sagittal_wcls, metricas_coronal_wcls)
+        def mostrar_metricas(resultados):
+            for method, metricas_por_vista in zip(methods, zip(*resultados)):
+                self.fill_metrics_column(method, metricas_por_vista)
+            self.run_pending_metrics()
 
-        # Actualizar métricas para BMR
-        actualizar_tabla_metricas(8, metricas_axial_bmr, metricas_sagittal_bmr, metricas_coronal_bmr)
+        self.restoration_job = self.run_job([partial(self.restoration_store.metrics_for, imagen, view, methods, **params)
+                                             for view, imagen in self.restoration_views.items()],
+                                            mostrar_metricas, "metricas")
 
-        # Mostrar resultados
-        self.display_transformed_slices()
-        self._actualizar_vistas_func = actualizar_vistas
-        self.hide_status_bar()
+    def clear_metrics_table(self):
+        """Vacía las métricas de todos los métodos y descarta las pendientes"""
+        self.pending_metrics = []
+        for row in range(self.metrics_table.rowCount()):
+            for col in range(self.metrics_table.columnCount()):
+                self.metrics_table.setItem(row, col, None)
 
+    def fill_metrics_column(self, method, metricas_por_vista):
+        """Escribe PSNR, IOSNR, MAE y SSIM de las vistas axial, sagital y coronal en la columna del método"""
+        column = RESTORATION_METHODS.index(method)
+        if method in self.pending_metrics:
+            self.pending_metrics.remove(method)
+        for vista, metricas in enumerate(metricas_por_vista):
+            for fila, (valor, formato) in enumerate(zip(metricas, (".2f", ".2f", ".4f", ".4f"))):
+                item = QTableWidgetItem(f"{valor:{formato}}")
+                item.setTextAlignment(Qt.AlignCenter)
+                self.metrics_table.setItem(4 * vista + fila, column, item)
 
 
 
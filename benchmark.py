@@ -0,0 +1,256 @@
+"""
+Benchmark reproducible de los núcleos de procesamiento sobre las series de test_images.
+
+Uso:
+    python benchmark.py [-o resultados.json] [--series Img Img2] [--kernels rotate restore_cls]
+                        [--scope slice|volume|all] [--repeat 5] [--no-display] [--compare anterior.json]
+
+Cada núcleo se mide sobre el corte axial central (scope "slice") y sobre todos los cortes axiales
+(scope "volume"). Se guarda el tiempo en frío (primera llamada, incluye la construcción de cachés),
+la mediana y el mínimo en caliente, y el pico de memoria reservada desde Python/NumPy (tracemalloc).
+Las pruebas de visualización usan una ventana VTK fuera de pantalla en un proceso aparte, de modo
+que una máquina sin OpenGL solo registra el error.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from processing import filters, frequency, geometry, metrics, resolution, restoration
+from processing.reslice import Reslicer
+from processing.series import load_series
+
+TEST_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_images")
+DEFAULT_SERIES = ("Img", "Img2", "Img3", "Img4", "Img5", "Img6")
+
+
+def kernel_table(fill_value):
+    """Núcleos medidos: nombre -> función(corte); mismos parámetros por defecto que la interfaz"""
+    return {
+        "rotate": lambda img: geometry.rotate(img, 30, fill_value),
+        "translate": lambda img: geometry.translate(img, 20, 20, fill_value),
+        "scale": lambda img: geometry.scale(img, 1.5, 1.5, fill_value),
+        "shear": lambda img: geometry.shear(img, 10, 10, fill_value),
+        "frequency_filter": lambda img: frequency.filter_slices([img], "low", "Gaussiana", 0.5, 1.0)[0],
+        "spatial_filter_low": lambda img: filters.apply_spatial_filter(img, "low", "", 1.0, 3),
+        "spatial_filter_low_15": lambda img: filters.apply_spatial_filter(img, "low", "", 1.0, 15),
+        "spatial_filter_sobel": lambda img: filters.apply_spatial_filter(img, "high", "Sobel-N", 1.0, 3),
+        "resample_down": lambda img: resolution.resample_image(img, "Submuestreo", 30),
+        "resample_up": lambda img: resolution.resample_image(img, "Sobremuestreo", 30),
+        "bit_depth": lambda img: resolution.reduce_bit_depth(img, 4),
+        "motion_blur": lambda img: resolution.apply_temporal_motion(img, 50, False),
+        "restore_cls": lambda img: restoration.restaurar_imagen(img, tipo="CLS", K=10)[0],
+        "restore_wcls": lambda img: restoration.restaurar_imagen(img, tipo="WCLS", K=10)[0],
+        "restore_bmr": lambda img: restoration.restaurar_imagen(img, tipo="BMR", K=10)[0],
+        "restore_cls_fft": lambda img: restoration.restaurar_imagen(img, tipo="CLS (FFT)", K=10)[0],
+        "restore_cls_fft_2d": lambda img: restoration.restaurar_imagen(img, tipo="CLS (FFT)", K=10, psf="2D")[0],
+        "metrics": lambda img: metrics.calcular_metricas(img, img[::-1]),
+    }
+
+
+def measure(func, repeat):
+    """Devuelve tiempos (frío, mediana y mínimo en caliente) y el pico de memoria de func"""
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds_first": first,
+        "seconds_median": statistics.median(times) if times else first,
+        "seconds_min": min(times) if times else first,
+        "repeat": repeat,
+        "peak_memory_bytes": peak,
+    }
+
+
+def benchmark_series(name, volume, spacing, kernels, scopes, repeat):
+    """Mide los núcleos seleccionados sobre una serie"""
+    results = []
+    middle = volume[volume.shape[0] // 2]
+    table = kernel_table(volume.min())
+    reslicer = Reslicer(volume, spacing)
+
+    for kernel in kernels:
+        if kernel == "reslice":
+            # El corte sagital depende del índice, no de un corte axial
+            n_sagittal = volume.shape[2]
+            workloads = {"slice": (lambda: reslicer.prepare("sagittal", n_sagittal // 2), 1),
+                         "volume": (lambda: [reslicer.prepare("sagittal", i) for i in range(n_sagittal)], n_sagittal)}
+        else:
+            kernel_func = table[kernel]
+            workloads = {"slice": (lambda: kernel_func(middle), 1),
+                         "volume": (lambda: [kernel_func(image) for image in volume], volume.shape[0])}
+
+        for scope in scopes:
+            func, n_slices = workloads[scope]
+            # El volumen completo se repite una sola vez en caliente para acotar la duración
+            result = measure(func, repeat if scope == "slice" else 1)
+            result.update({"series": name, "shape": list(volume.shape), "kernel": kernel, "scope": scope,
+                           "slices_per_second": n_slices / result["seconds_median"]})
+            results.append(result)
+            print(f"{name:6s} {kernel:22s} {scope:6s} {result['seconds_median'] * 1000:10.2f} ms"
+                  f"  {result['slices_per_second']:8.1f} cortes/s  {result['peak_memory_bytes'] / 2**20:8.1f} MiB")
+    return results
+
+
+def display_benchmarks(series_dirs, repeat, queue):
+    """Mide SlicePipeline y VolumePipeline en una ventana VTK fuera de pantalla (en un proceso aparte)"""
+    try:
+        import vtk
+        from DICOM_Viewer import SlicePipeline, VolumePipeline
+
+        results = []
+        for name, folder in series_dirs:
+            volume, dims, spacing = load_series(folder)
+
+            render_window = vtk.vtkRenderWindow()
+            render_window.SetOffScreenRendering(1)
+            render_window.SetSize(450, 300)
+            renderer = vtk.vtkRenderer()
+            render_window.AddRenderer(renderer)
+
+            pipeline = SlicePipeline(renderer)
+            pipeline.update(volume[0])
+            renderer.ResetCamera()
+            render_window.Render()
+
+            def scrub():
+                for image in volume:
+                    pipeline.update(image)
+                    render_window.Render()
+
+            result = measure(scrub, repeat)
+            result.update({"series": name, "shape": list(volume.shape), "kernel": "display_slice", "scope": "volume",
+                           "slices_per_second": volume.shape[0] / result["seconds_median"]})
+            results.append(result)
+
+            volume_window = vtk.vtkRenderWindow()
+            volume_window.SetOffScreenRendering(1)
+            volume_window.SetSize(450, 300)
+            volume_renderer = vtk.vtkRenderer()
+            volume_window.AddRenderer(volume_renderer)
+
+            def build_volume():
+                volume_renderer.RemoveAllViewProps()
+                pipeline_3d = VolumePipeline(volume_renderer, volume, spacing, 400, 1500, volume.min())
+                pipeline_3d.set_threshold(volume.min())
+                volume_renderer.ResetCamera()
+                volume_window.Render()
+
+            result = measure(build_volume, 1)
+            result.update({"series": name, "shape": list(volume.shape), "kernel": "update_3d_volume", "scope": "volume",
+                           "slices_per_second": volume.shape[0] / result["seconds_median"]})
+            results.append(result)
+        queue.put(results)
+    except Exception as e:
+        queue.put({"error": str(e)})
+
+
+def run_display_benchmarks(series_dirs, repeat):
+    """Lanza las pruebas de visualización en otro proceso; si falla (p. ej. sin OpenGL) devuelve el error"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=display_benchmarks, args=(series_dirs, repeat, queue))
+    process.start()
+
+    # Leer la cola antes de esperar al proceso para que no se bloquee al escribir
+    results = None
+    while results is None and (process.is_alive() or not queue.empty()):
+        try:
+            results = queue.get(timeout=0.5)
+        except Exception:
+            pass
+    process.join()
+    if results is None:
+        return [], f"El proceso de visualización terminó con código {process.exitcode}"
+    if isinstance(results, dict):
+        return [], results["error"]
+    return results, None
+
+
+def environment():
+    """Datos del entorno para poder comparar resultados entre commits y máquinas"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+    }
+
+
+def compare(previous_path, results):
+    """Imprime la aceleración respecto a un archivo de resultados anterior"""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {(r["series"], r["kernel"], r["scope"]): r for r in json.load(f)["results"]}
+    print(f"\nComparación con {previous_path} (>1 es más rápido):")
+    for result in results:
+        old = previous.get((result["series"], result["kernel"], result["scope"]))
+        if old is not None:
+            speedup = old["seconds_median"] / result["seconds_median"]
+            print(f"{result['series']:6s} {result['kernel']:22s} {result['scope']:6s} {speedup:8.2f}x")
+
+
+def main(argv=None):
+    all_kernels = list(kernel_table(0)) + ["reslice"]
+    parser = argparse.ArgumentParser(description="Benchmark de los núcleos de procesamiento sobre test_images.")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="Archivo JSON de resultados")
+    parser.add_argument("--series", nargs="+", default=list(DEFAULT_SERIES), help="Series de test_images a medir")
+    parser.add_argument("--kernels", nargs="+", default=all_kernels, choices=all_kernels, help="Núcleos a medir")
+    parser.add_argument("--scope", choices=("slice", "volume", "all"), default="all", help="Corte, volumen o ambos")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones en caliente por corte")
+    parser.add_argument("--no-display", action="store_true", help="Omitir las pruebas de visualización VTK")
+    parser.add_argument("--compare", help="Resultados anteriores con los que comparar")
+    args = parser.parse_args(argv)
+
+    scopes = ("slice", "volume") if args.scope == "all" else (args.scope,)
+    series_dirs = [(name, os.path.join(TEST_IMAGES, name)) for name in args.series]
+
+    results = []
+    for name, folder in series_dirs:
+        volume, dims, spacing = load_series(folder)
+        results.extend(benchmark_series(name, volume, spacing, args.kernels, scopes, args.repeat))
+
+    display_error = None
+    if not args.no_display:
+        display_results, display_error = run_display_benchmarks(series_dirs, args.repeat)
+        results.extend(display_results)
+        if display_error:
+            print(f"Pruebas de visualización omitidas: {display_error}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "display_error": display_error, "results": results}, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
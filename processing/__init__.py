@@ -0,0 +1 @@
+"""Núcleos de procesamiento de imágenes independientes de la interfaz (sin Qt ni VTK)."""
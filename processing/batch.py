@@ -0,0 +1,70 @@
+"""Procesamiento por lotes de todos los cortes de un volumen a lo largo de un eje."""
+import threading
+
+import numpy as np
+
+AXES = ("axial", "sagittal", "coronal")
+DEFAULT_CHUNK_SIZE = 8
+
+
+class BatchOutput:
+    """
+    Volumen derivado que se reserva al llegar el primer resultado (su forma depende del kernel).
+
+    Los resultados en float64 se guardan en float32 para no duplicar la memoria del volumen.
+    """
+
+    def __init__(self, n_slices):
+        self.n_slices = n_slices
+        self.volume = None
+        self._lock = threading.Lock()
+
+    def put(self, index, result):
+        result = np.asarray(result)
+        if self.volume is None:
+            with self._lock:
+                if self.volume is None:
+                    dtype = np.float32 if result.dtype == np.float64 else result.dtype
+                    self.volume = np.empty((self.n_slices,) + result.shape, dtype=dtype)
+        if result.shape != self.volume.shape[1:]:
+            raise ValueError(f"El corte {index} produjo una forma {result.shape} distinta de {self.volume.shape[1:]}.")
+        self.volume[index] = result
+
+
+def slice_source(volume, axis, reslicer=None):
+    """
+    Devuelve (get_slice, n_slices) para recorrer el volumen a lo largo de axis.
+
+    Los cortes sagitales y coronales se preparan con el reslicer (misma geometría que en las vistas)
+    sin pasar por su caché, por lo que get_slice puede llamarse desde varios hilos.
+    """
+    if axis == "axial":
+        return (lambda index: volume[index]), volume.shape[0]
+    if axis not in AXES:
+        raise ValueError(f"Eje '{axis}' no reconocido.")
+    if reslicer is None:
+        raise ValueError("Los cortes sagitales y coronales necesitan un reslicer.")
+    n_slices = volume.shape[2] if axis == "sagittal" else volume.shape[1]
+    return (lambda index: reslicer.prepare(axis, index)), n_slices
+
+
+def chunk_tasks(chunk_kernel, get_slice, n_slices, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Divide el volumen en bloques de chunk_size cortes; cada tarea procesa un bloque y lo escribe en output.
+
+    chunk_kernel recibe una lista de cortes y devuelve la lista de resultados en el mismo orden.
+    Cada tarea devuelve el número de cortes procesados.
+    """
+    def task(indices):
+        results = chunk_kernel([get_slice(index) for index in indices])
+        for index, result in zip(indices, results):
+            output.put(index, result)
+        return len(indices)
+
+    return [lambda indices=range(start, min(start + chunk_size, n_slices)): task(indices)
+            for start in range(0, n_slices, chunk_size)]
+
+
+def per_slice(kernel):
+    """Adapta un kernel de un corte a la interfaz de bloques"""
+    return lambda chunk: [kernel(image) for image in chunk]
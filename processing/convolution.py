@@ -0,0 +1,110 @@
+"""
+Convolución 2D con borde simétrico, equivalente a convolve2d(mode='same', boundary='symm').
+
+Según el kernel se elige el método más rápido:
+- "box": kernel constante grande (filtro de media), tabla de sumas acumuladas con coste fijo por píxel
+- "separable": kernel de rango 1 (Sobel/Prewitt N/S/E/W, media pequeña), dos pasadas 1D
+- "direct": kernels no separables, cv2.filter2D (que ya usa una DFT por bloques desde 11x11)
+- "fft": kernels muy grandes, producto de espectros con rfft2 (una sola transformada por pila)
+"""
+import cv2
+import numpy as np
+from scipy import fft as sp_fft
+
+from processing.frequency import FFT_WORKERS
+from processing.profiling import profiler
+
+METHODS = ("box", "separable", "direct", "fft")
+
+# Umbrales (número de coeficientes) medidos en cortes de 512x512: por debajo de BOX_MIN_KERNEL_SIZE
+# las dos pasadas 1D son más rápidas que la tabla de sumas, y filter2D es más rápido que la FFT propia
+# hasta kernels de ~101x101
+BOX_MIN_KERNEL_SIZE = 400
+FFT_MIN_KERNEL_SIZE = 101 * 101
+
+
+def choose_method(kernel):
+    """Método más rápido para el kernel (ver METHODS)"""
+    kernel = np.asarray(kernel, dtype=np.float64)
+    if np.all(kernel == kernel.flat[0]):
+        return "box" if kernel.size >= BOX_MIN_KERNEL_SIZE else "separable"
+    if min(kernel.shape) > 1:
+        singular = np.linalg.svd(kernel, compute_uv=False)
+        if singular[1] <= 1e-12 * singular[0]:
+            return "separable"
+    elif kernel.size > 1:
+        return "separable"
+    return "fft" if kernel.size >= FFT_MIN_KERNEL_SIZE else "direct"
+
+
+def _pad(stack, kernel_shape):
+    """Extiende por reflexión simétrica (abc|cba) para que la salida 'valid' tenga el tamaño original"""
+    kr, kc = kernel_shape
+    pad = ((kr // 2, kr - 1 - kr // 2), (kc // 2, kc - 1 - kc // 2))
+    return np.pad(stack, ((0, 0),) * (stack.ndim - 2) + pad, mode="symmetric")
+
+
+def _box(padded, kernel, shape):
+    """Suma de cada ventana con una tabla de sumas acumuladas (summed-area table)"""
+    kr, kc = kernel.shape
+    M, N = shape
+    table = cv2.integral(padded, sdepth=cv2.CV_64F)
+    sums = table[kr:kr + M, kc:kc + N] - table[:M, kc:kc + N] - table[kr:kr + M, :N] + table[:M, :N]
+    return sums * kernel.flat[0]
+
+
+def _separable(padded, kernel, shape):
+    """Dos pasadas 1D con los factores de la descomposición en valores singulares"""
+    u, s, vt = np.linalg.svd(kernel)
+    column = u[:, 0] * np.sqrt(s[0])
+    row = vt[0] * np.sqrt(s[0])
+    # cv2 correlaciona: se invierten los factores y se ancla en la esquina para recortar la zona válida
+    result = cv2.sepFilter2D(padded, cv2.CV_64F, row[::-1].copy(), column[::-1].copy(), anchor=(0, 0))
+    return result[:shape[0], :shape[1]]
+
+
+def _direct(padded, kernel, shape):
+    result = cv2.filter2D(padded, cv2.CV_64F, kernel[::-1, ::-1].copy(), anchor=(0, 0))
+    return result[:shape[0], :shape[1]]
+
+
+def _fft(padded_stack, kernel, shape):
+    """Convolución circular sobre la imagen extendida; la zona válida no se ve afectada por el solapamiento"""
+    kr, kc = kernel.shape
+    size = tuple(sp_fft.next_fast_len(n, real=True) for n in padded_stack.shape[-2:])
+    H = sp_fft.rfft2(kernel, s=size, workers=FFT_WORKERS)
+    F = sp_fft.rfft2(padded_stack, s=size, workers=FFT_WORKERS)
+    F *= H
+    result = sp_fft.irfft2(F, s=size, workers=FFT_WORKERS)
+    return result[..., kr - 1:kr - 1 + shape[0], kc - 1:kc - 1 + shape[1]]
+
+
+def convolve_stack(stack, kernel, method=None):
+    """
+    Convoluciona cada imagen de una pila (..., M, N) con el mismo kernel.
+
+    Devuelve float64 con la forma de la pila. method=None elige con choose_method().
+    """
+    stack = np.asarray(stack, dtype=np.float64)
+    kernel = np.asarray(kernel, dtype=np.float64)
+    method = method or choose_method(kernel)
+    if method not in METHODS:
+        raise ValueError(f"Método de convolución '{method}' no reconocido.")
+
+    shape = stack.shape[-2:]
+    with profiler.stage(f"convolucion.{method}", pila=stack, kernel=str(kernel.shape)):
+        padded = _pad(stack, kernel.shape)
+        if method == "fft":
+            return _fft(padded, kernel, shape)
+
+        images = padded.reshape((-1,) + padded.shape[-2:])
+        apply = {"box": _box, "separable": _separable, "direct": _direct}[method]
+        result = np.empty((len(images),) + shape)
+        for i, image in enumerate(images):
+            result[i] = apply(np.ascontiguousarray(image), kernel, shape)
+        return result.reshape(stack.shape)
+
+
+def convolve(image, kernel, method=None):
+    """Convolución de una imagen 2D (ver convolve_stack)"""
+    return convolve_stack(image, kernel, method)
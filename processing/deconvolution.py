@@ -0,0 +1,108 @@
+"""Restauración CLS en el dominio de Fourier con funciones de dispersión 1D o 2D."""
+from functools import lru_cache
+
+import numpy as np
+from scipy import fft as sp_fft
+from scipy import signal
+
+from processing.frequency import FFT_WORKERS
+from processing.profiling import profiler
+
+FFT_RESTORATION_TYPES = ("CLS (FFT)",)
+
+# 1D: dispersión a lo largo de las filas, el mismo modelo que la matriz S de restoration;
+# 2D: producto separable del mismo perfil en filas y columnas
+PSF_MODES = ("1D", "2D")
+
+
+def _profile(K, n):
+    """
+    Perfil |sinc| de ancho K para un eje de n muestras, normalizado como restoration.dispersion_matrix:
+    por la suma de la fila central de la Toeplitz n x n, que recorta el perfil si n < 4 * (K // 2) + 1.
+    """
+    half = K // 2
+    tail = np.abs(np.sinc(np.arange(1, 2 * half + 1) / half))
+    profile = np.concatenate([tail[::-1], [1.0], tail])
+    center = 2 * half
+    first, last = max(0, center - n // 2), center + (n - 1 - n // 2)
+    return profile / profile[first:last + 1].sum()
+
+
+@lru_cache(maxsize=16)
+def dispersion_psf(K, mode, shape):
+    """
+    PSF centrada con el perfil |sinc| de restoration.dispersion_matrix para imágenes de forma shape.
+
+    En 1D es una columna (4 * (K // 2) + 1, 1) con la misma normalización que S, de modo que
+    convolucionar con ella (bordes a cero) equivale a S @ V para cualquier número de filas;
+    en 2D es el producto del perfil de las filas y el de las columnas.
+    """
+    if mode not in PSF_MODES:
+        raise ValueError(f"PSF no reconocida: {mode}")
+    M, N = shape
+    psf = _profile(K, M)[:, None] if mode == "1D" else np.outer(_profile(K, M), _profile(K, N))
+    psf.setflags(write=False)
+    return psf
+
+
+def blur(stack, K, mode="1D"):
+    """Convolución de una imagen o pila (..., M, N) con la PSF, con bordes a cero (como S @ V en 1D)"""
+    stack = np.asarray(stack, dtype=np.float64)
+    psf = dispersion_psf(K, mode, stack.shape[-2:])
+    psf = psf.reshape((1,) * (stack.ndim - 2) + psf.shape)
+    return signal.fftconvolve(stack, psf, mode="same", axes=(-2, -1))
+
+
+def _padded_shape(shape, K, mode):
+    """Tamaño de transformada rápido que evita el solapamiento circular de la PSF"""
+    taps = dispersion_psf(K, mode, shape).shape
+    return tuple(sp_fft.next_fast_len(n + t - 1, real=True) for n, t in zip(shape, taps))
+
+
+@lru_cache(maxsize=16)
+def transfer_function(K, mode, shape, padded_shape):
+    """rfft2 de la PSF de imágenes de forma shape, desplazada para que su centro quede en el origen"""
+    psf = dispersion_psf(K, mode, shape)
+    kernel = np.zeros(padded_shape)
+    kernel[:psf.shape[0], :psf.shape[1]] = psf
+    kernel = np.roll(kernel, (-(psf.shape[0] // 2), -(psf.shape[1] // 2)), axis=(0, 1))
+    H = sp_fft.rfft2(kernel, workers=FFT_WORKERS)
+    H.setflags(write=False)
+    return H
+
+
+@lru_cache(maxsize=16)
+def _border_gain(shape, K, mode):
+    """Fracción de la PSF que cae dentro de la imagen en cada píxel (blur de una imagen de unos)"""
+    gain = blur(np.ones(shape), K, mode)
+    gain.setflags(write=False)
+    return gain
+
+
+def restaurar_fft(U, tipo="CLS (FFT)", K=10, alpha=0.1, mode="1D"):
+    """
+    Restaura una imagen o pila (..., M, N) degradada con la PSF de dispersion_psf(K, mode, (M, N)).
+
+    CLS (FFT) aplica conj(H) / (|H|² + alpha), la versión circulante de (S^T S + alpha I)^-1 S^T.
+
+    La degradación tiene bordes a cero, así que U se divide antes por la fracción de la PSF que cae
+    dentro de la imagen y se extiende por simetría hasta un tamaño de transformada rápido; con ello
+    la convolución circular no mezcla bordes opuestos. El coste es O(MN log MN) por corte.
+    """
+    if tipo not in FFT_RESTORATION_TYPES:
+        raise ValueError(f"Tipo debe ser uno de: {', '.join(FFT_RESTORATION_TYPES)}")
+    U = np.asarray(U, dtype=np.float64)
+    M, N = U.shape[-2:]
+    padded_shape = _padded_shape((M, N), K, mode)
+    pad = [(0, 0)] * (U.ndim - 2) + [((p - n) // 2, p - n - (p - n) // 2) for n, p in zip((M, N), padded_shape)]
+
+    with profiler.stage(f"restauracion.{tipo}", imagen=U, K=K, psf=mode):
+        extended = np.pad(U / _border_gain((M, N), K, mode), pad, mode="symmetric")
+        spectrum = sp_fft.rfft2(extended, workers=FFT_WORKERS)
+
+        H = transfer_function(K, mode, (M, N), padded_shape)
+        spectrum *= np.conj(H) / (H.real ** 2 + H.imag ** 2 + alpha)
+
+        restored = sp_fft.irfft2(spectrum, padded_shape, workers=FFT_WORKERS)
+        (top, _), (left, _) = pad[-2], pad[-1]
+        return restored[..., top:top + M, left:left + N]
@@ -0,0 +1,113 @@
+"""Banco de bordes: las 19 respuestas de SPATIAL_KERNELS y el gradiente Sobel de un corte en una sola pasada."""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from processing.profiling import profiler
+from processing.volume_cache import array_fingerprint
+
+GRADIENT_MAPS = ("Magnitud", "Orientación")
+EDGE_BANK_CACHE_SIZE = 6
+
+# Direcciones opuestas: misma respuesta que la dirección base con el signo cambiado
+_OPPOSITE = {"S": "N", "SW": "NE", "W": "E", "NW": "SE"}
+
+
+class EdgeBank:
+    """
+    Respuestas de todos los kernels de bordes (borde simétrico, como convolve2d) para una imagen.
+
+    Todas se obtienen de componentes compartidas sobre la imagen extendida: las Prewitt N y E (sumas
+    de filas y columnas desplazadas) y las diferencias centrales vertical, horizontal y diagonales:
+        Sobel-N = Prewitt-N + Dv        Sobel-NE = Prewitt-N + Prewitt-E    Prewitt-NE = Sobel-NE - Dne
+        Sobel-E = Prewitt-E + Dh        Sobel-SE = Prewitt-E - Prewitt-N    Prewitt-SE = Sobel-SE - Dse
+        Laplace-D = Laplace-8 - Laplace
+    Las direcciones S, SW, W y NW son las opuestas de N, NE, E y SE.
+    """
+
+    def __init__(self, image):
+        image = np.asarray(image, dtype=np.float64)
+        M, N = image.shape
+        padded = np.pad(image, 1, mode="symmetric")
+
+        def shift(dr, dc):
+            """Vista de x[i + dr, j + dc]"""
+            return padded[1 + dr:1 + dr + M, 1 + dc:1 + dc + N]
+
+        rows = {dr: shift(dr, -1) + shift(dr, 0) + shift(dr, 1) for dr in (-1, 0, 1)}
+        cols = {dc: shift(-1, dc) + shift(0, dc) + shift(1, dc) for dc in (-1, 1)}
+
+        prewitt_n = rows[1] - rows[-1]
+        prewitt_e = cols[-1] - cols[1]
+        sobel_ne = prewitt_n + prewitt_e
+        sobel_se = prewitt_e - prewitt_n
+        laplace = shift(-1, 0) + shift(1, 0) + shift(0, -1) + shift(0, 1) - 4 * image
+        laplace_8 = rows[-1] + rows[0] + rows[1] - 9 * image
+
+        self.responses = {
+            "Sobel-N": prewitt_n + (shift(1, 0) - shift(-1, 0)),
+            "Sobel-NE": sobel_ne,
+            "Sobel-E": prewitt_e + (shift(0, -1) - shift(0, 1)),
+            "Sobel-SE": sobel_se,
+            "Prewitt-N": prewitt_n,
+            "Prewitt-NE": sobel_ne - (shift(1, -1) - shift(-1, 1)),
+            "Prewitt-E": prewitt_e,
+            "Prewitt-SE": sobel_se - (shift(-1, -1) - shift(1, 1)),
+            "Laplace": laplace,
+            "Laplace-8": laplace_8,
+            "Laplace-D": laplace_8 - laplace,
+        }
+        for response in self.responses.values():
+            response.setflags(write=False)
+        self._gradient = None
+
+    def gradient(self):
+        """Magnitud y orientación (grados, de Sobel-E hacia Sobel-N); se calculan la primera vez"""
+        if self._gradient is None:
+            gx, gy = self.responses["Sobel-E"], self.responses["Sobel-N"]
+            self._gradient = (np.hypot(gx, gy), np.degrees(np.arctan2(gy, gx)))
+        return self._gradient
+
+    def response(self, name):
+        """Respuesta de un kernel de SPATIAL_KERNELS o de uno de GRADIENT_MAPS"""
+        if name in self.responses:
+            return self.responses[name]
+        family, _, direction = name.partition("-")
+        if direction in _OPPOSITE:
+            return -self.responses[f"{family}-{_OPPOSITE[direction]}"]
+        if name in GRADIENT_MAPS:
+            return self.gradient()[GRADIENT_MAPS.index(name)]
+        raise ValueError(f"Filtro no reconocido: {name}")
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def edge_bank(image):
+    """
+    Banco de bordes de la imagen, guardado por contenido en una caché LRU.
+
+    Cambiar de kernel sobre el mismo corte solo selecciona (o invierte) una respuesta ya calculada.
+    """
+    key = array_fingerprint(image)
+    with _lock:
+        bank = _cache.get(key)
+        if bank is not None:
+            _cache.move_to_end(key)
+            return bank
+
+    with profiler.stage("bordes.banco", corte=image):
+        bank = EdgeBank(image)
+    with _lock:
+        _cache[key] = bank
+        while len(_cache) > EDGE_BANK_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return bank
+
+
+def clear_cache():
+    """Descarta los bancos guardados"""
+    with _lock:
+        _cache.clear()
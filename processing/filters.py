@@ -0,0 +1,92 @@
+"""Filtrado espacial por convolución (suavizado y detección de bordes)."""
+import numpy as np
+
+from processing import convolution, edges
+from processing.profiling import profiled
+
+SPATIAL_KERNELS = {
+    # Sobel (8 direcciones)
+    "Sobel-N":    np.array([[ 1,  2,  1], [ 0,  0,  0], [-1, -2, -1]]),
+    "Sobel-NE":   np.array([[ 0,  1,  2], [-1,  0,  1], [-2, -1,  0]]),
+    "Sobel-E":    np.array([[-1,  0,  1], [-2,  0,  2], [-1,  0,  1]]),
+    "Sobel-SE":   np.array([[-2, -1,  0], [-1,  0,  1], [ 0,  1,  2]]),
+    "Sobel-S":    np.array([[-1, -2, -1], [ 0,  0,  0], [ 1,  2,  1]]),
+    "Sobel-SW":   np.array([[ 0, -1, -2], [ 1,  0, -1], [ 2,  1,  0]]),
+    "Sobel-W":    np.array([[ 1,  0, -1], [ 2,  0, -2], [ 1,  0, -1]]),
+    "Sobel-NW":   np.array([[ 2,  1,  0], [ 1,  0, -1], [ 0, -1, -2]]),
+
+    # Prewitt (8 direcciones)
+    "Prewitt-N":  np.array([[ 1,  1,  1], [ 0,  0,  0], [-1, -1, -1]]),
+    "Prewitt-NE": np.array([[ 0,  1,  1], [-1,  0,  1], [-1, -1,  0]]),
+    "Prewitt-E":  np.array([[-1,  0,  1], [-1,  0,  1], [-1,  0,  1]]),
+    "Prewitt-SE": np.array([[-1, -1,  0], [-1,  0,  1], [ 0,  1,  1]]),
+    "Prewitt-S":  np.array([[-1, -1, -1], [ 0,  0,  0], [ 1,  1,  1]]),
+    "Prewitt-SW": np.array([[ 0, -1, -1], [ 1,  0, -1], [ 1,  1,  0]]),
+    "Prewitt-W":  np.array([[ 1,  0, -1], [ 1,  0, -1], [ 1,  0, -1]]),
+    "Prewitt-NW": np.array([[ 1,  1,  0], [ 1,  0, -1], [ 0, -1, -1]]),
+
+    # Laplace (3 variantes)
+    "Laplace":    np.array([[ 0,  1,  0], [ 1, -4,  1], [ 0,  1,  0]]),
+    "Laplace-8":  np.array([[ 1,  1,  1], [ 1, -8,  1], [ 1,  1,  1]]),
+    "Laplace-D":  np.array([[ 1,  0,  1], [ 0, -4,  0], [ 1,  0,  1]])
+}
+
+
+def spatial_kernel(filter_type, filter_name, kernel_size=3):
+    """Kernel del filtro: media de kernel_size x kernel_size (pasa bajas) o uno de SPATIAL_KERNELS (pasa altas)"""
+    if filter_type == "low":
+        return np.full((kernel_size, kernel_size), 1.0 / kernel_size ** 2)
+    if filter_type == "high":
+        if filter_name not in SPATIAL_KERNELS:
+            raise ValueError(f"Filtro no reconocido: {filter_name}")
+        return SPATIAL_KERNELS[filter_name]
+    raise ValueError("Tipo de filtro inválido (usa 'low' o 'high')")
+
+
+def _finish(filtered, image, filter_type, factor):
+    if filter_type == "low":
+        # Mezcla con la imagen original para controlar el efecto
+        # factor=1: solo filtro, factor=0: solo imagen original
+        return factor * filtered + (1 - factor) * image
+    # Aplicar factor de intensidad
+    return filtered * factor
+
+
+@profiled("filtro_espacial")
+def apply_spatial_filter(image, filter_type, filter_name, factor=1.0, kernel_size=3, bank=False):
+    """
+    Filtro de media (pasa bajas) o de bordes (pasa altas) por convolución con borde simétrico.
+
+    Con bank=True (o para la magnitud y orientación del gradiente) la respuesta de bordes sale del
+    banco de bordes del corte, que se calcula una vez y se reutiliza al cambiar de kernel.
+    """
+    if filter_type == "high" and (bank or filter_name in edges.GRADIENT_MAPS):
+        return _finish(edges.edge_bank(image).response(filter_name), image, filter_type, factor)
+    kernel = spatial_kernel(filter_type, filter_name, kernel_size)
+    filtered = convolution.convolve(image, kernel)
+    return _finish(filtered, image, filter_type, factor)
+
+
+@profiled("filtro_espacial.lote")
+def filter_slices(slices, filter_type, filter_name, factor=1.0, kernel_size=3):
+    """
+    Aplica el filtro espacial a una lista de imágenes 2D.
+
+    Las imágenes con el mismo tamaño se convolucionan como una pila; el resultado conserva el orden de entrada.
+    """
+    if filter_type == "high" and filter_name in edges.GRADIENT_MAPS:
+        # En lote cada corte se ve una sola vez: banco sin caché
+        return [_finish(edges.EdgeBank(image).response(filter_name), image, filter_type, factor) for image in slices]
+
+    kernel = spatial_kernel(filter_type, filter_name, kernel_size)
+    groups = {}
+    for i, image in enumerate(slices):
+        groups.setdefault(image.shape, []).append(i)
+
+    filtered = [None] * len(slices)
+    for indices in groups.values():
+        stack = np.stack([slices[i] for i in indices])
+        result = _finish(convolution.convolve_stack(stack, kernel), stack, filter_type, factor)
+        for i, image in zip(indices, result):
+            filtered[i] = image
+    return filtered
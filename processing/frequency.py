@@ -0,0 +1,135 @@
+"""Banco de ventanas frecuenciales y filtrado en el dominio de Fourier."""
+import os
+from functools import lru_cache
+
+import numpy as np
+from scipy import fft as sp_fft
+
+from processing.profiling import profiler
+
+# Número de hilos para las transformadas (pocketfft reutiliza internamente los planes por tamaño)
+FFT_WORKERS = os.cpu_count() or 1
+
+WINDOW_NAMES = ("Gaussiana", "Gaussiana Mod", "Coseno", "Barlett", "Hanning", "Rectangular")
+
+
+@lru_cache(maxsize=8)
+def _radial_grids(shape):
+    """Devuelve las coordenadas normalizadas dx (filas), dy (columnas) y la distancia radial dxy"""
+    M, N = shape
+    dx = ((np.arange(M) - M / 2) / (M / 2))[:, None]
+    dy = ((np.arange(N) - N / 2) / (N / 2))[None, :]
+    dxy = np.sqrt(dx**2 + dy**2)
+    for grid in (dx, dy, dxy):
+        grid.setflags(write=False)
+    return dx, dy, dxy
+
+
+@lru_cache(maxsize=32)
+def frequency_window(shape, filter_name, sigma, n=2):
+    """
+    Calcula la ventana frecuencial centrada (disposición de fftshift) de forma cerrada.
+
+    Parámetros:
+    - shape: tamaño (M, N) del espectro
+    - filter_name: una de WINDOW_NAMES
+    - sigma: dimensión del radio, normalizada a [0, 1]
+    - n: exponente de la Gaussiana modificada
+    """
+    dx, dy, dxy = _radial_grids(tuple(shape))
+    K = sigma
+
+    if filter_name == "Coseno":
+        inside = (np.abs(dx) < sigma) & (np.abs(dy) < sigma)
+        H = np.where(inside, np.cos((np.pi * dx) / (2 * sigma)) * np.cos((np.pi * dy) / (2 * sigma)), 0.0)
+    elif filter_name == "Gaussiana Mod":
+        H = np.exp(-(dxy**n) / K)
+    elif filter_name == "Barlett":
+        ratio = dxy / sigma
+        H = np.where((ratio >= 0) & (ratio <= 1), 1 - ratio, 0.0)
+    elif filter_name == "Hanning":
+        inside = (dxy / sigma < np.pi) & (dxy < sigma)
+        H = np.where(inside, 0.5 * (np.cos((np.pi * dxy) / sigma) + 1), 0.0)
+    elif filter_name == "Gaussiana":
+        H = np.exp(-(dxy**2) / (2 * sigma**2))
+    elif filter_name == "Rectangular":
+        H = np.where(dxy < sigma, 1.0, 0.0)
+    else:
+        raise ValueError(f"Filtro '{filter_name}' no reconocido.")
+
+    H = np.broadcast_to(H, shape).astype(np.float32)
+    H.setflags(write=False)
+    return H
+
+
+@lru_cache(maxsize=32)
+def transfer_function(shape, filter_type, filter_name, sigma, border_factor):
+    """
+    Devuelve la función de transferencia H de un filtro pasa bajas ('low') o pasa altas ('high').
+
+    Las ventanas y las funciones de transferencia se memorizan con desalojo LRU, de modo
+    que cambiar solo el factor reutiliza la ventana ya calculada.
+    """
+    H = frequency_window(tuple(shape), filter_name, sigma)
+
+    if filter_type == "high":
+        H = (1 - H) * np.float32(border_factor)
+    else:
+        H = H ** np.float32(border_factor)
+
+    H.setflags(write=False)
+    return H
+
+
+@lru_cache(maxsize=32)
+def half_spectrum_transfer(shape, filter_type, filter_name, sigma, border_factor):
+    """
+    Devuelve H en la disposición de medio espectro de rfft2 (sin fftshift, N // 2 + 1 columnas).
+
+    La máscara se simetriza como H(k) = (H(k) + H(-k)) / 2, que es exactamente lo que
+    aplicaba quedarse con la parte real de ifft2 sobre el espectro completo.
+    """
+    H = np.fft.ifftshift(transfer_function(tuple(shape), filter_type, filter_name, sigma, border_factor))
+    H_mirror = np.roll(H[::-1, ::-1], 1, axis=(0, 1))
+    H_half = ((H + H_mirror) / 2)[:, :shape[1] // 2 + 1]
+    H_half.setflags(write=False)
+    return H_half
+
+
+def filter_stack(stack, H_half):
+    """Filtra una pila (..., M, N) de imágenes del mismo tamaño con una sola rfft2/irfft2"""
+    stack = np.asarray(stack, dtype=np.float64)
+    with profiler.stage("frecuencia.rfft2", pila=stack):
+        F = sp_fft.rfft2(stack, workers=FFT_WORKERS)
+    F *= H_half
+    with profiler.stage("frecuencia.irfft2", espectro=F):
+        return sp_fft.irfft2(F, s=stack.shape[-2:], workers=FFT_WORKERS)
+
+
+def filter_slices(slices, filter_type, filter_name, sigma, border_factor):
+    """
+    Aplica un filtro frecuencial a una lista de imágenes 2D.
+
+    Las imágenes con el mismo tamaño se apilan y se transforman en un único lote;
+    el resultado conserva el orden de entrada.
+    """
+    groups = {}
+    for i, image in enumerate(slices):
+        groups.setdefault(image.shape, []).append(i)
+
+    filtered = [None] * len(slices)
+    for shape, indices in groups.items():
+        with profiler.stage("frecuencia.transferencia", forma=str(shape), ventana=filter_name):
+            H_half = half_spectrum_transfer(shape, filter_type, filter_name, sigma, border_factor)
+        result = filter_stack(np.stack([slices[i] for i in indices]), H_half)
+        for i, image in zip(indices, result):
+            filtered[i] = image
+    return filtered
+
+
+def clear_cache():
+    """Vacía las cachés de ventanas y funciones de transferencia"""
+    half_spectrum_transfer.cache_clear()
+    transfer_function.cache_clear()
+    frequency_window.cache_clear()
+    _radial_grids.cache_clear()
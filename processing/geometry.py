@@ -0,0 +1,109 @@
+"""Motor de transformaciones geométricas por mapeo inverso."""
+from functools import lru_cache
+
+import numpy as np
+
+from processing import resampling
+from processing.profiling import profiled
+
+
+@lru_cache(maxsize=8)
+def _output_grid(shape):
+    """Devuelve la rejilla de coordenadas (y, x) de un lienzo de salida, reutilizable entre llamadas"""
+    yy, xx = np.indices(shape, dtype=np.float64)
+    yy.setflags(write=False)
+    xx.setflags(write=False)
+    return yy, xx
+
+
+@profiled("geometria.warp")
+def affine_warp(img_array, matrix, offset, output_shape, fill_value):
+    """
+    Deforma una imagen 2D con una transformación afín usando mapeo inverso.
+
+    Parámetros:
+    - img_array: ndarray 2D de entrada
+    - matrix: matriz 2x2 del mapeo directo, en coordenadas (y, x)
+    - offset: desplazamiento (y, x) que se suma tras aplicar la matriz
+    - output_shape: tamaño (alto, ancho) del lienzo de salida
+    - fill_value: valor para los píxeles que no provienen de la imagen original
+
+    Cada píxel de salida busca su origen con la inversa de la matriz y toma el vecino
+    más cercano, por lo que el resultado no tiene huecos.
+    """
+    h, w = img_array.shape
+    inverse = np.linalg.inv(np.asarray(matrix, dtype=np.float64))
+    yy, xx = _output_grid(tuple(int(n) for n in output_shape))
+
+    dy = yy - offset[0]
+    dx = xx - offset[1]
+    src_y = np.floor(inverse[0, 0] * dy + inverse[0, 1] * dx + 0.5).astype(np.intp)
+    src_x = np.floor(inverse[1, 0] * dy + inverse[1, 1] * dx + 0.5).astype(np.intp)
+
+    valid = (src_y >= 0) & (src_y < h) & (src_x >= 0) & (src_x < w)
+
+    warped = np.full(output_shape, fill_value, dtype=img_array.dtype)
+    warped[valid] = img_array[src_y[valid], src_x[valid]]
+    return warped
+
+
+def _bounding_canvas(matrix, h, w):
+    """Calcula el lienzo que contiene las esquinas transformadas y el desplazamiento mínimo"""
+    corners = np.array([
+        [0, 0],
+        [0, w],
+        [h, 0],
+        [h, w]
+    ])
+    projected = np.dot(corners, np.asarray(matrix).T)
+    min_coords = projected.min(axis=0)
+    max_coords = projected.max(axis=0)
+    new_h = int(np.ceil(max_coords[0] - min_coords[0]))
+    new_w = int(np.ceil(max_coords[1] - min_coords[1]))
+    return (new_h, new_w), min_coords
+
+
+def rotate(img_array, angle_degrees, fill_value):
+    """Rota la imagen en sentido horario sobre un lienzo que contiene la imagen completa"""
+    angle = -np.radians(angle_degrees)  # signo negativo para rotar en sentido horario
+    cos_theta = np.cos(angle)
+    sin_theta = np.sin(angle)
+
+    T = np.array([
+        [cos_theta, -sin_theta],
+        [sin_theta,  cos_theta]
+    ])
+
+    output_shape, min_coords = _bounding_canvas(T, *img_array.shape)
+    return affine_warp(img_array, T, -min_coords, output_shape, fill_value)
+
+
+def translate(img_array, ty, tx, fill_value):
+    """Desplaza la imagen (ty, tx) píxeles conservando el tamaño original"""
+    return affine_warp(img_array, np.eye(2), (ty, tx), img_array.shape, fill_value)
+
+
+def scale(img_array, scale_y, scale_x, fill_value):
+    """
+    Escala la imagen con factores independientes por eje e interpolación bilineal.
+
+    El lienzo coincide con la imagen escalada, así que fill_value no se usa (se conserva la firma común).
+    """
+    h, w = img_array.shape
+    output_shape = (max(1, round(h * scale_y)), max(1, round(w * scale_x)))
+    return resampling.resample(img_array, output_shape, "bilinear", align_corners=False)
+
+
+def shear(img_array, shear_y_deg, shear_x_deg, fill_value):
+    """Inclina la imagen según los ángulos de inclinación (en grados) de cada eje"""
+    shear_y = np.tan(np.radians(shear_y_deg))
+    shear_x = np.tan(np.radians(shear_x_deg))
+
+    H = np.array([
+        [1, shear_y],
+        [shear_x, 1]
+    ])
+
+    output_shape, min_coords = _bounding_canvas(H, *img_array.shape)
+    offset = (-int(np.floor(min_coords[0])), -int(np.floor(min_coords[1])))
+    return affine_warp(img_array, H, offset, output_shape, fill_value)
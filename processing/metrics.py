@@ -0,0 +1,115 @@
+"""Métricas de calidad entre una imagen original y sus reconstrucciones."""
+import numpy as np
+from scipy.ndimage import uniform_filter
+
+from processing.profiling import profiled
+
+METRIC_NAMES = ("PSNR", "IOSNR", "MAE", "SSIM")
+
+# Parámetros de SSIM por defecto de skimage (ventana uniforme 7x7, covarianza muestral, rango 1)
+SSIM_WIN_SIZE = 7
+SSIM_C1 = (0.01 * 1.0) ** 2
+SSIM_C2 = (0.03 * 1.0) ** 2
+
+
+def normalize(img):
+    """Lleva la imagen a [0, 1]; una imagen constante se devuelve sin cambios"""
+    img = np.asarray(img, dtype=np.float64)
+    low, high = img.min(), img.max()
+    return (img - low) / (high - low) if high != low else img
+
+
+def _metrics_from(mse, energy, mae, ssim):
+    """PSNR, IOSNR, MAE y SSIM a partir de los errores medios (escalares o arrays por reconstrucción)"""
+    with np.errstate(divide="ignore"):
+        return np.array([10 * np.log10(1.0 / mse), 10 * np.log10(energy / mse), mae, ssim])
+
+
+def _local_mean(stack):
+    """Media en ventanas de SSIM_WIN_SIZE x SSIM_WIN_SIZE sobre el plano de cada imagen de la pila"""
+    size = (1,) * (stack.ndim - 2) + (SSIM_WIN_SIZE, SSIM_WIN_SIZE)
+    return uniform_filter(stack, size=size)
+
+
+class ReferenceMetrics:
+    """
+    Estadísticas de la imagen original calculadas una vez: normalización, energía y momentos locales de SSIM.
+
+    score() evalúa cualquier número de reconstrucciones contra ellas en una sola pasada vectorizada,
+    con los mismos resultados que peak_signal_noise_ratio y structural_similarity de skimage.
+    """
+
+    def __init__(self, original):
+        self.norm = normalize(original)
+        self.energy = np.mean(self.norm ** 2)
+        self.mean = _local_mean(self.norm)
+        n_window = SSIM_WIN_SIZE ** 2
+        self.cov_norm = n_window / (n_window - 1)
+        self.variance = self.cov_norm * (_local_mean(self.norm * self.norm) - self.mean ** 2)
+
+    def components(self, reconstructions):
+        """Error cuadrático medio, error absoluto medio y SSIM de cada reconstrucción (arrays de longitud k)"""
+        candidates = np.stack([normalize(image) for image in reconstructions])
+        diff = self.norm - candidates
+        mse = np.mean(diff ** 2, axis=(-2, -1))
+        mae = np.mean(np.abs(diff), axis=(-2, -1))
+
+        mean_y = _local_mean(candidates)
+        variance_y = self.cov_norm * (_local_mean(candidates * candidates) - mean_y ** 2)
+        covariance = self.cov_norm * (_local_mean(self.norm * candidates) - self.mean * mean_y)
+        ssim_map = ((2 * self.mean * mean_y + SSIM_C1) * (2 * covariance + SSIM_C2)
+                    / ((self.mean ** 2 + mean_y ** 2 + SSIM_C1) * (self.variance + variance_y + SSIM_C2)))
+        pad = (SSIM_WIN_SIZE - 1) // 2
+        ssim = ssim_map[:, pad:ssim_map.shape[1] - pad, pad:ssim_map.shape[2] - pad].mean(axis=(-2, -1))
+        return mse, mae, ssim
+
+    def score(self, reconstructions):
+        """Matriz (k, 4) con PSNR, IOSNR, MAE y SSIM de cada reconstrucción"""
+        mse, mae, ssim = self.components(reconstructions)
+        return _metrics_from(mse, self.energy, mae, ssim).T
+
+
+@profiled("metricas")
+def calcular_metricas(original, reconstruida):
+    """
+    Calcula PSNR, IOSNR, MAE y SSIM entre dos imágenes.
+    Normaliza ambas imágenes al rango [0, 1] antes de calcular las métricas.
+    """
+    return ReferenceMetrics(original).score([reconstruida])[0]
+
+
+@profiled("metricas.referencia")
+def metricas_candidatas(original, reconstrucciones):
+    """Métricas (k, 4) de varias reconstrucciones de la misma imagen, con la referencia calculada una vez"""
+    return ReferenceMetrics(original).score(reconstrucciones)
+
+
+class VolumeMetrics:
+    """
+    Acumula métricas corte a corte y las agrega sobre el volumen.
+
+    El agregado pondera por píxeles: PSNR e IOSNR salen del error cuadrático medio de todos los vóxeles,
+    MAE del error absoluto medio y SSIM es la media de los SSIM de cada corte.
+    """
+
+    def __init__(self):
+        self.per_slice = []
+        self._sums = np.zeros(4)  # error cuadrático, energía, error absoluto y SSIM, ponderados por píxeles
+        self._pixels = 0
+
+    def add(self, original, reconstruida):
+        """Añade un corte y devuelve sus métricas"""
+        reference = ReferenceMetrics(original)
+        mse, mae, ssim = reference.components([reconstruida])
+        n = reference.norm.size
+        self._sums += n * np.array([mse[0], reference.energy, mae[0], ssim[0]])
+        self._pixels += n
+        values = _metrics_from(mse[0], reference.energy, mae[0], ssim[0])
+        self.per_slice.append(values)
+        return values
+
+    def aggregate(self):
+        """Métricas del volumen completo (vector de 4, en el orden de METRIC_NAMES)"""
+        mse, energy, mae, ssim = self._sums / self._pixels
+        return _metrics_from(mse, energy, mae, ssim)
+
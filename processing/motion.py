@@ -0,0 +1,121 @@
+"""Degradación por movimiento como convolución 1D (o 2D para ángulos arbitrarios) con kernels en caché."""
+from functools import lru_cache
+
+import numpy as np
+from scipy import fft as sp_fft
+from scipy import ndimage, signal
+
+from processing.frequency import FFT_WORKERS
+from processing.profiling import profiler
+
+# Umbrales medidos en cortes de 512x512: hasta DIRECT_MAX_TAPS coeficientes la convolución directa es
+# la más rápida; con más, el producto por la matriz de banda (BLAS) gana a la FFT en ejes de hasta
+# BAND_MAX_SIZE muestras, y la FFT en ejes mayores
+DIRECT_MAX_TAPS = 31
+BAND_MAX_SIZE = 1024
+
+# Coeficientes relativos por debajo de este valor no cambian el resultado en doble precisión
+_NEGLIGIBLE = 1e-16
+
+
+@lru_cache(maxsize=64)
+def motion_kernel(length, strength):
+    """
+    Kernel 1D centrado del desenfoque: t[|m|] con t = exp(-n / strength²), n = 0.01..3, normalizado.
+
+    Es la misma fila que toeplitz(vec) en la versión matricial (simétrica, de ahí los dos lados);
+    length recorta el kernel al tamaño del eje y los coeficientes despreciables se descartan.
+    """
+    n = np.arange(0.01, 3.01, 0.01)
+    t = np.exp(-n / (strength ** 2))
+    t /= t.sum()
+    t = t[:length]
+    t = t[:max(1, np.count_nonzero(t >= t[0] * _NEGLIGIBLE))]
+    kernel = np.concatenate([t[:0:-1], t])
+    kernel.setflags(write=False)
+    return kernel
+
+
+@lru_cache(maxsize=8)
+def band_matrix(length, strength):
+    """Matriz simétrica de banda (length x length) con el kernel en cada fila, como toeplitz(vec)"""
+    taps = motion_kernel(length, strength)
+    half = len(taps) // 2
+    distance = np.abs(np.subtract.outer(np.arange(length), np.arange(length)))
+    matrix = np.where(distance <= half, taps[half + np.minimum(distance, half)], 0.0)
+    matrix.setflags(write=False)
+    return matrix
+
+
+@lru_cache(maxsize=16)
+def _kernel_spectrum(length, strength, n_fft):
+    """rfft del kernel 1D con el tamaño de transformada n_fft"""
+    spectrum = sp_fft.rfft(motion_kernel(length, strength), n_fft)
+    spectrum.setflags(write=False)
+    return spectrum
+
+
+def _fft_convolve_last_axis(stack, length, strength):
+    """Convolución lineal ('same') a lo largo del último eje con el espectro del kernel en caché"""
+    n = stack.shape[-1]
+    taps = len(motion_kernel(length, strength))
+    n_fft = sp_fft.next_fast_len(n + taps - 1, real=True)
+    spectrum = sp_fft.rfft(stack, n_fft, axis=-1, workers=FFT_WORKERS)
+    spectrum *= _kernel_spectrum(length, strength, n_fft)
+    result = sp_fft.irfft(spectrum, n_fft, axis=-1, workers=FFT_WORKERS)
+    return result[..., taps // 2:taps // 2 + n]
+
+
+@lru_cache(maxsize=16)
+def motion_kernel_2d(length, strength, angle):
+    """Kernel 1D trazado a lo largo de angle (grados, 0 horizontal, 90 vertical) con reparto bilineal"""
+    taps = motion_kernel(length, strength)
+    half = len(taps) // 2
+    offsets = np.arange(-half, half + 1)
+    theta = np.radians(angle)
+    # Filas hacia arriba para ángulos positivos, como en un sistema de ejes convencional
+    ys, xs = -offsets * np.sin(theta), offsets * np.cos(theta)
+
+    size = 2 * int(np.ceil(half)) + 3
+    center = size // 2
+    kernel = np.zeros((size, size))
+    y0, x0 = np.floor(ys).astype(int), np.floor(xs).astype(int)
+    fy, fx = ys - y0, xs - x0
+    for dy, wy in ((0, 1 - fy), (1, fy)):
+        for dx, wx in ((0, 1 - fx), (1, fx)):
+            np.add.at(kernel, (center + y0 + dy, center + x0 + dx), taps * wy * wx)
+    kernel.setflags(write=False)
+    return kernel
+
+
+def apply_motion(stack, strength, axis=None, angle=None):
+    """
+    Desenfoca una imagen o una pila (..., M, N) con bordes a cero, como el producto por la Toeplitz.
+
+    Con axis (-2 vertical, -1 horizontal) se usa una convolución 1D: directa, por matriz de banda o
+    por FFT según los coeficientes y el tamaño del eje; con angle, el kernel 2D de motion_kernel_2d por FFT.
+    """
+    stack = np.asarray(stack, dtype=np.float64)
+    if angle is not None:
+        with profiler.stage("movimiento.angular", pila=stack, angulo=angle):
+            kernel = motion_kernel_2d(max(stack.shape[-2:]), strength, float(angle))
+            kernel = kernel.reshape((1,) * (stack.ndim - 2) + kernel.shape)
+            return signal.fftconvolve(stack, kernel, mode="same", axes=(-2, -1))
+
+    length = stack.shape[axis]
+    kernel = motion_kernel(length, strength)
+    if len(kernel) <= DIRECT_MAX_TAPS:
+        method = "directa"
+    else:
+        method = "banda" if length <= BAND_MAX_SIZE else "fft"
+
+    with profiler.stage(f"movimiento.{method}", pila=stack, coeficientes=len(kernel)):
+        if method == "directa":
+            return ndimage.convolve1d(stack, kernel, axis=axis, mode="constant", cval=0.0)
+        if method == "banda":
+            matrix = band_matrix(length, strength)
+            return matrix @ stack if axis in (-2, stack.ndim - 2) else stack @ matrix
+        # El eje se lleva al final (contiguo), que es donde la rfft es más rápida
+        moved = np.ascontiguousarray(np.moveaxis(stack, axis, -1))
+        result = _fft_convolve_last_axis(moved, stack.shape[axis], strength)
+        return np.ascontiguousarray(np.moveaxis(result, -1, axis))
@@ -0,0 +1,257 @@
+"""
+Procesamiento por lotes sin interfaz gráfica.
+
+Uso:
+    python -m processing.pipeline <carpeta> <pipeline.json|.yaml> [-o salida] [-w procesos]
+
+<carpeta> es una serie DICOM o una carpeta cuyas subcarpetas son series. El pipeline es una lista
+de pasos (o un objeto con "steps" y opcionalmente "axis", "format" y "metrics"), por ejemplo:
+
+    {"axis": "axial", "format": "npy", "metrics": true,
+     "steps": [{"op": "rotate", "angle": 30},
+               {"op": "frequency_filter", "filter_type": "low", "window": "Gaussiana", "sigma": 0.5}]}
+
+Cada serie se procesa en un proceso aparte; el resultado se guarda como <serie>.npy (o como una
+serie DICOM con format "dicom", requiere pydicom) y las métricas por corte en metrics.csv, con una
+fila "volumen" por serie que las agrega sobre todos los vóxeles.
+No importa Qt ni los módulos de visualización de VTK.
+"""
+import argparse
+import csv
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from processing import batch, filters, frequency, geometry, metrics, resolution, restoration
+from processing.reslice import Reslicer
+from processing.series import DicomSeries, _read_slice
+
+METRIC_NAMES = metrics.METRIC_NAMES
+
+
+def _rotate(image, fill_value, angle=0.0):
+    return geometry.rotate(image, angle, fill_value)
+
+
+def _translate(image, fill_value, dx=0, dy=0):
+    return geometry.translate(image, dy, dx, fill_value)
+
+
+def _scale(image, fill_value, sx=1.0, sy=1.0):
+    return geometry.scale(image, sy, sx, fill_value)
+
+
+def _shear(image, fill_value, shear_x=0.0, shear_y=0.0):
+    return geometry.shear(image, shear_y, shear_x, fill_value)
+
+
+def _spatial_filter(image, fill_value, filter_type="low", filter_name="", factor=1.0, kernel_size=3):
+    return filters.apply_spatial_filter(image, filter_type, filter_name, factor, kernel_size)
+
+
+def _frequency_filter(image, fill_value, filter_type="low", window="Gaussiana", sigma=0.5, border_factor=1.0):
+    return frequency.filter_slices([image], filter_type, window, sigma, border_factor)[0]
+
+
+def _resample(image, fill_value, sampling_type="Submuestreo", percentage=30):
+    return resolution.resample_image(image, sampling_type, percentage)
+
+
+def _bit_depth(image, fill_value, bits=8, value_range=None):
+    return resolution.reduce_bit_depth(image, bits, value_range)
+
+
+def _motion_blur(image, fill_value, intensity=50, direction="horizontal", angle=None):
+    return resolution.apply_temporal_motion(image, intensity, direction == "vertical", angle)
+
+
+def _restore(image, fill_value, method="CLS", K=10, N0=0.1, seed=None, psf="1D"):
+    return restoration.restaurar_imagen(image, tipo=method, K=K, N0=N0, seed=seed, psf=psf)[0]
+
+
+# Operaciones disponibles en los pasos del pipeline: nombre -> función(imagen, relleno, **parámetros)
+OPERATIONS = {
+    "rotate": _rotate,
+    "translate": _translate,
+    "scale": _scale,
+    "shear": _shear,
+    "spatial_filter": _spatial_filter,
+    "frequency_filter": _frequency_filter,
+    "resample": _resample,
+    "bit_depth": _bit_depth,
+    "motion_blur": _motion_blur,
+    "restore": _restore,
+}
+
+
+def load_spec(path):
+    """Lee el pipeline (JSON o YAML) y lo normaliza a un diccionario con sus valores por defecto"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Se necesita PyYAML para leer pipelines .yaml (o usa JSON).")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if isinstance(spec, list):
+        spec = {"steps": spec}
+    spec = {"axis": "axial", "format": "npy", "metrics": True, **spec}
+    validate_spec(spec)
+    return spec
+
+
+def validate_spec(spec):
+    """Comprueba operaciones y parámetros antes de lanzar los procesos"""
+    if spec["axis"] not in batch.AXES:
+        raise ValueError(f"Eje '{spec['axis']}' no reconocido (usa {', '.join(batch.AXES)}).")
+    if spec["format"] not in ("npy", "dicom"):
+        raise ValueError(f"Formato '{spec['format']}' no reconocido (usa npy o dicom).")
+    if spec["format"] == "dicom" and spec["axis"] != "axial":
+        raise ValueError("La salida DICOM solo está disponible para el eje axial.")
+    for position, step in enumerate(spec["steps"], start=1):
+        params = dict(step)
+        name = params.pop("op", None)
+        if name not in OPERATIONS:
+            raise ValueError(f"Paso {position}: operación '{name}' no reconocida.")
+        try:
+            inspect.signature(OPERATIONS[name]).bind(None, None, **params)
+        except TypeError as e:
+            raise ValueError(f"Paso {position} ({name}): {e}")
+
+
+def find_series(folder):
+    """Devuelve las series de la carpeta: ella misma si contiene archivos o, si no, sus subcarpetas"""
+    entries = sorted(os.scandir(folder), key=lambda e: e.name)
+    if any(entry.is_file() for entry in entries):
+        return [folder]
+    return [entry.path for entry in entries if entry.is_dir()]
+
+
+def process_series(series_dir, spec, output_dir):
+    """Aplica el pipeline a todos los cortes de una serie; devuelve (nombre, cortes, segundos, filas de métricas)"""
+    start = time.perf_counter()
+    name = os.path.basename(os.path.normpath(series_dir))
+
+    series = DicomSeries(series_dir)
+    volume, spacing = series.decode_all(), series.spacing
+    fill_value = volume.min()
+    reslicer = Reslicer(volume, spacing) if spec["axis"] != "axial" else None
+    get_slice, n_slices = batch.slice_source(volume, spec["axis"], reslicer)
+    steps = [(OPERATIONS[step["op"]], {k: v for k, v in step.items() if k != "op"}) for step in spec["steps"]]
+
+    output = batch.BatchOutput(n_slices)
+    volume_metrics = metrics.VolumeMetrics()
+    rows = []
+    for index in range(n_slices):
+        original = get_slice(index)
+        image = original
+        for operation, params in steps:
+            image = operation(image, fill_value, **params)
+        output.put(index, image)
+
+        # Las métricas solo tienen sentido si el paso final conserva la geometría del corte
+        if spec["metrics"] and np.shape(image) == original.shape:
+            rows.append([name, index] + [float(value) for value in volume_metrics.add(original, image)])
+    if volume_metrics.per_slice:
+        rows.append([name, "volumen"] + [float(value) for value in volume_metrics.aggregate()])
+
+    if spec["format"] == "dicom":
+        write_dicom_series(series.files, output.volume, os.path.join(output_dir, name))
+    else:
+        np.save(os.path.join(output_dir, f"{name}.npy"), output.volume)
+        with open(os.path.join(output_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"series": os.path.abspath(series_dir), "spacing": list(spacing),
+                       "axis": spec["axis"], "steps": spec["steps"]}, f, indent=2)
+
+    return name, n_slices, time.perf_counter() - start, rows
+
+
+def write_dicom_series(source_files, volume, output_dir):
+    """
+    Escribe cada corte axial como DICOM copiando la cabecera del archivo original.
+
+    Los valores se devuelven a la escala almacenada (pendiente/intersección) y se recortan al tipo de dato.
+    Las filas del volumen están en el orden de vtkDICOMImageReader (pixel data invertido verticalmente),
+    así que se vuelven a invertir al escribir; el primer corte se relee para comprobar la ida y vuelta.
+    """
+    try:
+        import pydicom
+        from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+    except ImportError:
+        raise ImportError("Se necesita pydicom para escribir la salida en DICOM (o usa format npy).")
+
+    os.makedirs(output_dir, exist_ok=True)
+    series_uid = generate_uid()
+    for index, (path, image) in enumerate(zip(source_files, volume)):
+        ds = pydicom.dcmread(path)
+        slope = float(getattr(ds, "RescaleSlope", 1.0))
+        intercept = float(getattr(ds, "RescaleIntercept", 0.0))
+        dtype = np.int16 if getattr(ds, "PixelRepresentation", 0) == 1 else np.uint16
+        limits = np.iinfo(dtype)
+        stored = np.clip(np.round((np.asarray(image, dtype=np.float64) - intercept) / slope), limits.min, limits.max)
+        stored = stored.astype(dtype)[::-1]
+
+        ds.Rows, ds.Columns = stored.shape
+        ds.BitsAllocated, ds.BitsStored, ds.HighBit = 16, 16, 15
+        ds.PixelData = stored.tobytes()
+        ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+        ds.SeriesInstanceUID = series_uid
+        ds.SOPInstanceUID = generate_uid()
+        ds.file_meta.MediaStorageSOPInstanceUID = ds.SOPInstanceUID
+        output_path = os.path.join(output_dir, f"{index:04d}.dcm")
+        ds.save_as(output_path)
+
+        if index == 0:
+            expected = stored[::-1] * slope + intercept
+            if not np.allclose(_read_slice(output_path), expected):
+                raise RuntimeError(f"El corte escrito en {output_path} no coincide con el original al releerlo.")
+
+
+def run(folder, spec, output_dir, workers=None):
+    """Procesa todas las series de la carpeta en un pool de procesos y escribe metrics.csv"""
+    os.makedirs(output_dir, exist_ok=True)
+    series_dirs = find_series(folder)
+    all_rows = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_series, series_dir, spec, output_dir) for series_dir in series_dirs]
+        for series_dir, future in zip(series_dirs, futures):
+            try:
+                name, n_slices, elapsed, rows = future.result()
+            except Exception as e:
+                print(f"Error al procesar {series_dir}: {str(e)}")
+                continue
+            print(f"{name}: {n_slices} cortes en {elapsed:.2f} s ({n_slices / elapsed:.1f} cortes/s)")
+            all_rows.extend(rows)
+
+    if spec["metrics"]:
+        with open(os.path.join(output_dir, "metrics.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["serie", "corte"] + list(METRIC_NAMES))
+            writer.writerows(all_rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica un pipeline de procesamiento a series DICOM sin interfaz gráfica.")
+    parser.add_argument("folder", help="Serie DICOM o carpeta con una serie por subcarpeta")
+    parser.add_argument("pipeline", help="Archivo JSON o YAML con los pasos")
+    parser.add_argument("-o", "--output", default="salida", help="Carpeta de salida (por defecto: salida)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Número de procesos (por defecto: CPUs)")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.pipeline)
+    except (OSError, ValueError, ImportError) as e:
+        parser.error(str(e))
+    run(args.folder, spec, args.output, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Instrumentación por etapas: tiempos, tamaños de arrays y memoria, exportables como traza de Chrome."""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+MAX_EVENTS = 20000
+
+
+def describe(value):
+    """Descripción corta de un argumento para la traza (forma y tipo si es un array)"""
+    if isinstance(value, np.ndarray):
+        return f"{'x'.join(str(n) for n in value.shape)} {value.dtype}"
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], np.ndarray):
+        return f"{len(value)} x {describe(value[0])}"
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class Profiler:
+    """
+    Registro de etapas con marca de inicio, duración, hilo y argumentos.
+
+    Desactivado no registra nada y stage() devuelve un contexto vacío, por lo que los
+    puntos de instrumentación pueden quedarse en el código sin coste apreciable.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_allocations = False
+        self.events = deque(maxlen=MAX_EVENTS)
+        self._lock = threading.Lock()
+        self._active = []  # Etapas en curso medidas con tracemalloc
+        self._origin = time.perf_counter()
+
+    def enable(self, track_allocations=False):
+        """
+        Activa el registro; con track_allocations se mide la memoria neta reservada por etapa.
+
+        tracemalloc no distingue hilos, así que allocated_bytes solo se guarda en las etapas que no
+        coincidieron con otras de otros hilos; en las tareas paralelas del pool se omite.
+        """
+        self.enabled = True
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.track_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.track_allocations = False
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def stage(self, name, **args):
+        """Contexto que mide una etapa; los argumentos se guardan descritos con describe()"""
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name, args)
+
+    @contextmanager
+    def _stage(self, name, args):
+        tracking = self.track_allocations and tracemalloc.is_tracing()
+        if tracking:
+            state = self._enter_tracked()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if tracking:
+                memory_after = tracemalloc.get_traced_memory()[0]
+                if not self._exit_tracked(state):
+                    args["allocated_bytes"] = memory_after - memory_before
+            self.record(name, start, end, **args)
+
+    def _enter_tracked(self):
+        """
+        Registra una etapa medida con tracemalloc, que cuenta la memoria de todo el proceso.
+
+        Si coincide con etapas de otros hilos (vistas o bloques de un lote en el pool, la carga de la
+        serie), ambas se marcan como compartidas: la diferencia incluiría reservas y liberaciones ajenas.
+        """
+        state = {"tid": threading.get_ident(), "shared": False}
+        with self._lock:
+            for other in self._active:
+                if other["tid"] != state["tid"]:
+                    other["shared"] = state["shared"] = True
+            self._active.append(state)
+        return state
+
+    def _exit_tracked(self, state):
+        """Retira la etapa de las activas; devuelve True si coincidió con etapas de otros hilos"""
+        with self._lock:
+            self._active.remove(state)
+        return state["shared"]
+
+    def record(self, name, start, end, **args):
+        """Registra una etapa medida a mano (p. ej. un trabajo que termina en otro callback)"""
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "start": start - self._origin,
+            "duration": end - start,
+            "thread": threading.current_thread().name,
+            "tid": threading.get_ident(),
+            "args": {key: describe(value) for key, value in args.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self):
+        """Por etapa: número de llamadas, tiempo total, medio y último (en segundos)"""
+        with self._lock:
+            events = list(self.events)
+        stats = {}
+        for event in events:
+            entry = stats.setdefault(event["name"], {"count": 0, "total": 0.0, "last": 0.0})
+            entry["count"] += 1
+            entry["total"] += event["duration"]
+            entry["last"] = event["duration"]
+        for entry in stats.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return stats
+
+    def export_chrome_trace(self, path):
+        """Guarda los eventos en formato Trace Event (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = list(self.events)
+        trace = [{
+            "name": event["name"],
+            "ph": "X",
+            "ts": event["start"] * 1e6,
+            "dur": event["duration"] * 1e6,
+            "pid": os.getpid(),
+            "tid": event["tid"],
+            "args": dict(event["args"], thread=event["thread"]),
+        } for event in events]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+def profiled(name):
+    """Decorador que mide cada llamada como una etapa, describiendo el primer argumento"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(name, entrada=args[0] if args else None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Registro compartido por la interfaz y los núcleos de procesamiento
+profiler = Profiler()
+if os.environ.get("DICOM_VIEWER_PROFILE"):
+    profiler.enable(track_allocations=os.environ.get("DICOM_VIEWER_PROFILE") == "memory")
@@ -0,0 +1,124 @@
+"""Pirámide de niveles reducidos por promedio de área para submuestreo, miniaturas y niveles de detalle 3D."""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from processing import resampling
+from processing.profiling import profiler
+from processing.volume_cache import array_fingerprint
+
+PYRAMID_CACHE_SIZE = 8
+
+# Cortes procesados a la vez al reducir un volumen (acota la memoria temporal en float64)
+VOLUME_CHUNK = 32
+
+
+class Pyramid:
+    """
+    Niveles de un corte (M, N) o de un volumen (cortes, M, N), cada uno la mitad del anterior.
+
+    Cada nivel se obtiene del anterior promediando áreas de 2x2 píxeles, por lo que no hay aliasing.
+    Los niveles se construyen bajo demanda y se guardan en float32; el nivel 0 es el array original.
+    Con reduce_depth, en un volumen también se reduce el eje axial mientras queden min_slices cortes.
+    """
+
+    def __init__(self, data, reduce_depth=False, min_slices=16):
+        self.levels = [data]
+        self.reduce_depth = reduce_depth and data.ndim == 3
+        self.min_slices = min_slices
+        self._lock = threading.Lock()
+
+    def _next_shape(self, shape):
+        plane = tuple(max(1, n // 2) for n in shape[-2:])
+        if len(shape) == 2:
+            return plane
+        depth = shape[0] // 2 if self.reduce_depth and shape[0] // 2 >= self.min_slices else shape[0]
+        return (depth,) + plane
+
+    def _halve(self, data):
+        shape = self._next_shape(data.shape)
+        if data.ndim == 2:
+            return resampling.resample(data, shape, "area").astype(np.float32)
+
+        reduced = np.empty((data.shape[0],) + shape[1:], dtype=np.float32)
+        for start in range(0, data.shape[0], VOLUME_CHUNK):
+            reduced[start:start + VOLUME_CHUNK] = resampling.resample(data[start:start + VOLUME_CHUNK], shape[1:], "area")
+        if shape[0] != data.shape[0]:
+            reduced = resampling.resample_axis(reduced, shape[0], 0, "area").astype(np.float32)
+        return reduced
+
+    def level(self, k):
+        """Nivel k (reducción 2**k en el plano); se construyen los niveles intermedios que falten"""
+        with self._lock:
+            while len(self.levels) <= k:
+                with profiler.stage("piramide.nivel", nivel=len(self.levels), entrada=self.levels[-1]):
+                    reduced = self._halve(self.levels[-1])
+                reduced.setflags(write=False)
+                self.levels.append(reduced)
+            return self.levels[k]
+
+    def level_shape(self, k):
+        """Forma del nivel k sin construirlo"""
+        shape = self.levels[0].shape
+        for _ in range(k):
+            shape = self._next_shape(shape)
+        return shape
+
+    def resize(self, output_shape):
+        """
+        Reduce el plano a output_shape = (alto, ancho) partiendo del nivel más pequeño que aún no es
+        menor que la salida, con un último remuestreo por área. Devuelve float64.
+        """
+        out_h, out_w = output_shape
+        k = 0
+        while True:
+            next_shape = self.level_shape(k + 1)
+            if next_shape == self.level_shape(k) or next_shape[-2] < out_h or next_shape[-1] < out_w:
+                break
+            k += 1
+        return resampling.resample(self.level(k), output_shape, "area")
+
+    def thumbnail(self, max_size):
+        """Miniatura cuyo lado mayor mide max_size píxeles (conserva la proporción)"""
+        h, w = self.levels[0].shape[-2:]
+        factor = min(1.0, max_size / max(h, w))
+        return self.resize((max(1, round(h * factor)), max(1, round(w * factor))))
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def slice_pyramid(image):
+    """Pirámide de un corte, guardada por contenido para reutilizarla con otros factores de reducción"""
+    key = array_fingerprint(image)
+    with _lock:
+        pyramid = _cache.get(key)
+        if pyramid is not None:
+            _cache.move_to_end(key)
+            return pyramid
+        pyramid = Pyramid(np.ascontiguousarray(image))
+        _cache[key] = pyramid
+        while len(_cache) > PYRAMID_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pyramid
+
+
+def downsample(image, factor):
+    """
+    Reduce un corte factor veces sin aliasing.
+
+    La salida tiene el mismo tamaño que image[::factor, ::factor] (redondeo hacia arriba).
+    """
+    h, w = image.shape
+    output_shape = (-(-h // factor), -(-w // factor))
+    if factor == 1:
+        return np.asarray(image, dtype=np.float64)
+    return slice_pyramid(image).resize(output_shape)
+
+
+def clear_cache():
+    """Descarta las pirámides guardadas"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,90 @@
+"""Cuantización radiométrica con tablas de consulta (LUT) sobre datos enteros de 8 y 16 bits."""
+from functools import lru_cache
+
+import numpy as np
+
+from processing.profiling import profiler
+
+# Cortes cuantizados a la vez en un volumen (acota el temporal de la operación in situ)
+VOLUME_CHUNK = 32
+
+
+def quantize_values(values, vmin, vmax, bits):
+    """
+    Fórmula de referencia: normaliza a [0, 1] entre vmin y vmax, redondea a 2**bits - 1 pasos y
+    vuelve a la escala original. Con 0 bits todo queda en vmin.
+    """
+    max_level = (1 << bits) - 1
+    if max_level == 0:
+        return np.full(np.shape(values), float(vmin))
+    normalized = np.clip((np.asarray(values, dtype=np.float64) - vmin) / (vmax - vmin), 0.0, 1.0)
+    return np.round(normalized * max_level) / max_level * (vmax - vmin) + vmin
+
+
+def has_lut(dtype):
+    """Los enteros de hasta 16 bits se cuantizan con LUT; el resto con la fórmula"""
+    dtype = np.dtype(dtype)
+    return dtype.kind in "iu" and dtype.itemsize <= 2
+
+
+@lru_cache(maxsize=32)
+def quantization_lut(vmin, vmax, bits, dtype, out_dtype="f8"):
+    """
+    LUT de 2**(8 * itemsize) entradas (65536 para 16 bits) indexada por el código sin signo de cada valor.
+
+    Si out_dtype es entero, los niveles se redondean y recortan a su rango (cuantización in situ).
+    """
+    dtype, out_dtype = np.dtype(dtype), np.dtype(out_dtype)
+    codes = np.arange(1 << (8 * dtype.itemsize), dtype=f"u{dtype.itemsize}")
+    lut = quantize_values(codes.view(dtype), vmin, vmax, bits)
+    if out_dtype.kind in "iu":
+        limits = np.iinfo(out_dtype)
+        lut = np.clip(np.round(lut), limits.min, limits.max)
+    lut = lut.astype(out_dtype)
+    lut.setflags(write=False)
+    return lut
+
+
+def quantize(image, bits, value_range=None, out=None):
+    """
+    Reduce image a 2**bits niveles entre value_range (por defecto, su mínimo y máximo).
+
+    Los enteros de 8/16 bits se resuelven con un único gather sobre la LUT. out puede ser la propia
+    imagen (cuantización in situ en su tipo entero) o un array de otro tipo; por defecto, float64.
+    """
+    image = np.asarray(image)
+    vmin, vmax = value_range if value_range is not None else (image.min(), image.max())
+    if not has_lut(image.dtype):
+        result = quantize_values(image, vmin, vmax, bits)
+    else:
+        out_dtype = out.dtype if out is not None else np.dtype(np.float64)
+        lut = quantization_lut(float(vmin), float(vmax), bits, image.dtype.str, out_dtype.str)
+        result = lut[image.view(f"u{image.dtype.itemsize}")]
+
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+def quantize_volume(volume, bits, value_range=None, per_slice=False, out=None):
+    """
+    Cuantiza todos los cortes de un volumen.
+
+    Con per_slice cada corte usa su propio rango; si no, value_range o el rango global del volumen
+    (una sola LUT). out=volume cuantiza in situ; por defecto se reserva un volumen float32.
+    """
+    if out is None:
+        out = np.empty(volume.shape, dtype=np.float32)
+    if not per_slice and value_range is None:
+        value_range = (volume.min(), volume.max())
+
+    with profiler.stage("cuantizacion.volumen", volumen=volume, bits=bits, por_corte=per_slice):
+        for start in range(0, len(volume), VOLUME_CHUNK):
+            chunk = slice(start, start + VOLUME_CHUNK)
+            if per_slice:
+                for image, target in zip(volume[chunk], out[chunk]):
+                    quantize(image, bits, out=target)
+            else:
+                quantize(volume[chunk], bits, value_range, out=out[chunk])
+    return out
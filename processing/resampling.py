@@ -0,0 +1,98 @@
+"""Remuestreo vectorizado (vecino más cercano, bilineal, bicúbico y por área) con tablas en caché."""
+from functools import lru_cache
+
+import numpy as np
+
+from processing.profiling import profiler
+
+METHODS = ("nearest", "bilinear", "bicubic", "area")
+
+
+def _cubic(t, a=-0.5):
+    """Núcleo cúbico de Keys"""
+    t = np.abs(t)
+    near = (a + 2) * t**3 - (a + 3) * t**2 + 1
+    far = a * t**3 - 5 * a * t**2 + 8 * a * t - 4 * a
+    return np.where(t <= 1, near, np.where(t < 2, far, 0.0))
+
+
+@lru_cache(maxsize=32)
+def axis_table(n_in, n_out, method, align_corners=True):
+    """
+    Índices y pesos (n_out, taps) para remuestrear un eje de n_in a n_out muestras.
+
+    Con align_corners la primera y la última muestra coinciden (np.linspace(0, n_in - 1, n_out));
+    si no, se alinean los centros de píxel. "area" promedia el intervalo de entrada que cubre cada
+    salida, ponderado por solapamiento. Los índices fuera del eje se recortan al borde.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de remuestreo '{method}' no reconocido.")
+
+    if method == "area":
+        step = n_in / n_out
+        start = np.arange(n_out) * step
+        indices = np.floor(start).astype(np.intp)[:, None] + np.arange(int(np.ceil(step)) + 1)
+        low = np.maximum(indices, start[:, None])
+        high = np.minimum(indices + 1, start[:, None] + step)
+        weights = np.clip(high - low, 0, None) / step
+    else:
+        if align_corners:
+            coords = np.linspace(0, n_in - 1, n_out)
+        else:
+            coords = (np.arange(n_out) + 0.5) * (n_in / n_out) - 0.5
+
+        if method == "nearest":
+            indices = np.floor(coords + 0.5).astype(np.intp)[:, None]
+            weights = np.ones(indices.shape)
+        else:
+            base = np.floor(coords).astype(np.intp)
+            frac = (coords - base)[:, None]
+            offsets = np.arange(2) if method == "bilinear" else np.arange(-1, 3)
+            indices = base[:, None] + offsets
+            weights = np.hstack([1 - frac, frac]) if method == "bilinear" else _cubic(frac - offsets)
+
+    indices = np.clip(indices, 0, n_in - 1)
+    indices.setflags(write=False)
+    weights.setflags(write=False)
+    return indices, weights
+
+
+def _resample_axis(data, table, axis):
+    indices, weights = table
+    shape = [1] * data.ndim
+    shape[axis] = len(indices)
+    result = weights[:, 0].reshape(shape) * np.take(data, indices[:, 0], axis=axis)
+    for tap in range(1, indices.shape[1]):
+        result += weights[:, tap].reshape(shape) * np.take(data, indices[:, tap], axis=axis)
+    return result
+
+
+def resample(image, output_shape, method="bilinear", align_corners=True):
+    """
+    Remuestrea una imagen 2D (o una pila (..., M, N)) a output_shape = (alto, ancho).
+
+    Las filas y las columnas se procesan por separado con las tablas de axis_table(), que se
+    reutilizan entre cortes del mismo tamaño. Devuelve float64.
+    """
+    data = np.asarray(image, dtype=np.float64)
+    M, N = data.shape[-2:]
+    out_h, out_w = (int(n) for n in output_shape)
+    with profiler.stage(f"remuestreo.{method}", entrada=data, salida=str((out_h, out_w))):
+        if out_h != M:
+            data = _resample_axis(data, axis_table(M, out_h, method, align_corners), -2)
+        if out_w != N:
+            data = _resample_axis(data, axis_table(N, out_w, method, align_corners), -1)
+    return data
+
+
+def resample_axis(data, n_out, axis, method="bilinear", align_corners=True):
+    """Remuestrea un solo eje de data (p. ej. el eje axial de un volumen); devuelve float64"""
+    data = np.asarray(data, dtype=np.float64)
+    if data.shape[axis] == n_out:
+        return data
+    return _resample_axis(data, axis_table(data.shape[axis], int(n_out), method, align_corners), axis)
+
+
+def clear_cache():
+    """Vacía la caché de tablas"""
+    axis_table.cache_clear()
@@ -0,0 +1,83 @@
+"""Cortes sagitales y coronales con relación de aspecto física y caché LRU."""
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from processing.profiling import profiler
+
+AXES = ("sagittal", "coronal")
+
+
+class Reslicer:
+    """
+    Extrae cortes sagitales y coronales de un volumen (cortes, filas, columnas).
+
+    La geometría de salida se calcula una sola vez a partir del espaciado: el eje horizontal
+    conserva la resolución del plano axial y el eje vertical (cortes) se reescala para que
+    ambos tengan el mismo tamaño de píxel. Los cortes con interpolación Lanczos se guardan en
+    una caché LRU por (eje, índice); el modo rápido (lineal) sirve para el arrastre de sliders.
+    """
+
+    def __init__(self, volume, spacing, cache_size=64):
+        self.volume = volume
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+        n_slices, rows, cols = volume.shape
+        sx, sy, sz = spacing
+        # Tamaños de salida (alto, ancho)
+        self.shapes = {
+            "sagittal": (max(1, int(round(n_slices * sz / sy))), rows),
+            "coronal": (max(1, int(round(n_slices * sz / sx))), cols),
+        }
+
+    def _raw_slice(self, axis, index):
+        """Corte sin reescalar, con el primer corte axial abajo"""
+        if axis == "sagittal":
+            raw = self.volume[:, :, index]
+        elif axis == "coronal":
+            raw = self.volume[:, index, :]
+        else:
+            raise ValueError(f"Eje '{axis}' no reconocido.")
+        return raw[::-1]
+
+    def _resample(self, axis, index, interpolation):
+        raw = self._raw_slice(axis, index)
+        height, width = self.shapes[axis]
+        if raw.shape == (height, width):
+            return np.ascontiguousarray(raw)
+        with profiler.stage("reslice.resize", eje=axis, salida=str((height, width))):
+            return cv2.resize(np.ascontiguousarray(raw), (width, height), interpolation=interpolation)
+
+    def prepare(self, axis, index):
+        """Corte con interpolación Lanczos sin usar la caché (seguro desde varios hilos)"""
+        return self._resample(axis, index, cv2.INTER_LANCZOS4)
+
+    def is_cached(self, axis, index):
+        return (axis, index) in self._cache
+
+    def get(self, axis, index, fast=False):
+        """
+        Devuelve el corte preparado (de solo lectura).
+
+        Con fast=True, si el corte no está en caché se devuelve una interpolación lineal sin guardarla.
+        """
+        key = (axis, index)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        if fast:
+            return self._resample(axis, index, cv2.INTER_LINEAR)
+
+        result = self.prepare(axis, index)
+        result.setflags(write=False)
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Descarta los cortes guardados (p. ej. si el volumen cambió)"""
+        self._cache.clear()
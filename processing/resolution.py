@@ -0,0 +1,61 @@
+"""Modificación de resolución espacial, radiométrica y temporal de un corte."""
+import numpy as np
+
+from processing import motion, pyramid, quantization, resampling
+from processing.profiling import profiled
+
+
+@profiled("resolucion.remuestreo")
+def resample_image(img_array, sampling_type, percentage):
+    """Submuestreo por un factor entero (sin aliasing) o sobremuestreo con interpolación bilineal según el porcentaje"""
+    h, w = img_array.shape
+
+    if sampling_type == "Submuestreo":
+        factor = 1 + (percentage / 100) * 10
+        factor = int(np.clip(round(factor), 1, min(h, w)))
+        # Mismo tamaño que img_array[::factor, ::factor], promediando desde la pirámide del corte
+        return pyramid.downsample(img_array, factor).astype(np.float32)
+
+    elif sampling_type == "Sobremuestreo":
+        scale = 1 + (percentage / 100)  # 0.3 → 1.3x
+
+        new_h = int(h * scale)
+        new_w = int(w * scale)
+
+        # Interpolación bilineal con las esquinas alineadas (tablas por tamaño en caché)
+        return resampling.resample(img_array, (new_h, new_w), "bilinear").astype(np.float32)
+
+
+@profiled("resolucion.profundidad_bits")
+def reduce_bit_depth(image, bits, value_range=None):
+    """
+    Reduce la profundidad de bits de la imagen entre value_range (por defecto, su mínimo y máximo).
+
+    Los cortes enteros de 16 bits se cuantizan con una LUT de 65536 entradas (ver processing.quantization).
+    """
+    if bits >= 16:
+        return image  # No hacer nada si ya es 16 bits o más
+
+    min_val, max_val = value_range if value_range is not None else (image.min(), image.max())
+    if max_val == min_val:  # Evitar división por cero
+        return image
+
+    return quantization.quantize(image, bits, (min_val, max_val))
+
+
+@profiled("resolucion.movimiento")
+def apply_temporal_motion(img_array, motion_strength, is_vertical, angle=None):
+    """
+    Aplica desenfoque por movimiento simulado sin alterar la escala de intensidades DICOM.
+
+    Vertical u horizontal por defecto; con angle (grados, 0 horizontal, 90 vertical) en cualquier dirección.
+    """
+    motion_strength = motion_strength / 100.0  # Convertir a rango [0, 1]
+    if motion_strength <= 0.0:
+        return img_array.astype(np.float32)
+
+    if angle is not None:
+        blurred = motion.apply_motion(img_array, motion_strength, angle=angle)
+    else:
+        blurred = motion.apply_motion(img_array, motion_strength, axis=-2 if is_vertical else -1)
+    return blurred.astype(np.float32, copy=False)  # Mismo tipo que sin movimiento
@@ -0,0 +1,178 @@
+"""Restauración de imágenes degradadas (LS, CLS, WCLS y BMR con sistemas factorizados; CLS por FFT)."""
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, toeplitz
+
+from processing import deconvolution
+from processing.profiling import profiler
+from processing.volume_cache import array_fingerprint
+
+MATRIX_RESTORATION_TYPES = ('LS', 'CLS', 'WCLS', 'BMR')
+RESTORATION_TYPES = MATRIX_RESTORATION_TYPES + deconvolution.FFT_RESTORATION_TYPES
+
+# Imágenes degradadas con semilla guardadas (tres vistas x varios juegos de parámetros)
+DEGRADATION_CACHE_SIZE = 12
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=8)
+def dispersion_matrix(M, K):
+    """Construye la matriz del sistema S (Toeplitz de |sinc(x)|, ancho de banda 2 * (K // 2))"""
+    half = K // 2
+    a = np.zeros(M)
+    a[1:2 * half + 1] = np.abs(np.sinc(np.arange(1, 2 * half + 1) / half))
+    a[0] = 1
+    S = toeplitz(a)
+    S /= np.sum(S[M // 2, :])  # Normalización
+    return _readonly(S)
+
+
+@lru_cache(maxsize=8)
+def _normal_matrix(M, K):
+    """Devuelve S^T S, común a todos los métodos"""
+    S = dispersion_matrix(M, K)
+    return _readonly(S.T @ S)
+
+
+@lru_cache(maxsize=16)
+def _cls_operator(M, K, alpha):
+    """
+    Operador de restauración (S^T S + alpha I)^-1 S^T (alpha = 0 para LS).
+
+    Se obtiene con una factorización de Cholesky y se memoriza, de modo que cada
+    restauración posterior con el mismo (M, K, alpha) es un único producto matricial.
+    """
+    S = dispersion_matrix(M, K)
+    factor = cho_factor(_normal_matrix(M, K) + alpha * np.eye(M))
+    return _readonly(cho_solve(factor, S.T))
+
+
+@lru_cache(maxsize=16)
+def _wcls_operator(M, K, N0, alpha, m1):
+    """Operador W = (S^T Mu S + alpha Mv)^-1 S^T Mu de WCLS, con Mu = I / N0"""
+    S = dispersion_matrix(M, K)
+    b = np.zeros(M)
+    b[0], b[1] = 2, -1
+    Mv = toeplitz(b)
+    Mv[0, 0] = Mv[-1, -1] = 1
+    Mv = np.eye(M) + m1 * Mv
+    factor = cho_factor(_normal_matrix(M, K) / N0 + alpha * Mv)
+    return _readonly(cho_solve(factor, S.T / N0))
+
+
+_degradations = OrderedDict()
+_degradations_lock = threading.Lock()
+
+
+def clear_cache():
+    """Libera las matrices, operadores e imágenes degradadas memorizados"""
+    for cached in (dispersion_matrix, _normal_matrix, _cls_operator, _wcls_operator):
+        cached.cache_clear()
+    with _degradations_lock:
+        _degradations.clear()
+
+
+def degradar(imagen, K=10, N0=0.1, seed=None, psf="1D"):
+    """
+    Imagen degradada U = h * V + ruido gaussiano de varianza N0.
+
+    h es la PSF de deconvolution.dispersion_psf, normalizada como S: con psf "1D" la convolución
+    (por FFT, bordes a cero) equivale a S V para cualquier tamaño; con "2D" el mismo perfil dispersa
+    también a lo largo de las columnas.
+    Con seed el ruido es reproducible (np.random.default_rng) y U se guarda por (contenido, K, N0, seed, psf)
+    como array de solo lectura, de modo que todos los métodos restauran la misma U sin volver a
+    calcularla. Sin seed se usa el generador global y cada llamada produce un ruido nuevo.
+    """
+    key = (array_fingerprint(imagen), K, N0, seed, psf) if seed is not None else None
+    if key is not None:
+        with _degradations_lock:
+            U = _degradations.get(key)
+            if U is not None:
+                _degradations.move_to_end(key)
+                return U
+
+    with profiler.stage("restauracion.degradacion", imagen=imagen, K=K, psf=psf):
+        generador = np.random.default_rng(seed) if seed is not None else np.random
+        ruido = generador.standard_normal(imagen.shape) * np.sqrt(N0)
+        U = deconvolution.blur(imagen, K, psf) + ruido
+
+    if key is not None:
+        U.setflags(write=False)
+        with _degradations_lock:
+            _degradations[key] = U
+            while len(_degradations) > DEGRADATION_CACHE_SIZE:
+                _degradations.popitem(last=False)
+    return U
+
+
+def restaurar_imagen(imagen_original, tipo='LS', K=10, N0=0.1, alpha=0.1, m1=0.3, seed=None, U=None, psf="1D"):
+    """
+    Aplica un algoritmo de reconstrucción (LS, CLS, WCLS, BMR o CLS (FFT)) a una imagen degradada.
+
+    Parámetros:
+    - imagen_original: ndarray 2D (imagen en escala de grises, normalizada entre 0 y 1)
+    - tipo: str, uno de RESTORATION_TYPES
+    - K: int, ancho de la función de dispersión (matriz del sistema S)
+    - N0: float, varianza del ruido
+    - alpha: float, parámetro de regularización para CLS y WCLS
+    - m1: float, parámetro de ponderación para WCLS
+    - seed: int opcional, semilla del ruido de la degradación (misma semilla, misma imagen degradada)
+    - U: ndarray opcional, imagen degradada ya calculada con degradar(); si se da, seed no se usa
+    - psf: "1D" o "2D", función de dispersión de la degradación (ver deconvolution.PSF_MODES)
+
+    Las matrices de los sistemas no se invierten explícitamente: se factorizan una sola
+    vez por (M, K, alpha, ...) y se reutilizan entre métodos y vistas del mismo tamaño.
+    Los métodos matriciales modelan solo la dispersión 1D (con psf "2D" se rechazan); los de FFT
+    (deconvolution.restaurar_fft) modelan también la 2D y cuestan O(MN log MN), por lo que sirven para cortes grandes.
+    """
+    if tipo not in RESTORATION_TYPES:
+        raise ValueError(f"Tipo debe ser uno de: {', '.join(RESTORATION_TYPES)}")
+    if tipo in MATRIX_RESTORATION_TYPES and psf != "1D":
+        raise ValueError(f"{tipo} solo modela la dispersión 1D; con la PSF {psf} usa "
+                         f"{', '.join(deconvolution.FFT_RESTORATION_TYPES)}")
+
+    V = imagen_original
+    M, N = V.shape
+
+    if U is None:
+        U = degradar(V, K, N0, seed, psf)
+
+    if tipo in deconvolution.FFT_RESTORATION_TYPES:
+        return deconvolution.restaurar_fft(U, tipo, K, alpha, psf), U
+
+    S = dispersion_matrix(M, K)
+
+    # Estimaciones
+    if tipo == 'LS':
+        return _cls_operator(M, K, 0.0) @ U, U
+
+    # Estimación CLS, punto de partida de WCLS y BMR
+    with profiler.stage("restauracion.CLS", imagen=V, K=K):
+        mv = _cls_operator(M, K, alpha) @ U
+
+    if tipo == 'CLS':
+        restaurada = mv
+
+    elif tipo == 'WCLS':
+        with profiler.stage("restauracion.WCLS", imagen=V, K=K):
+            restaurada = mv + _wcls_operator(M, K, N0, alpha, m1) @ (U - S @ mv)
+
+    elif tipo == 'BMR':
+        # (S^T Rn^-1 S + Rv^-1)^-1 S^T Rn^-1 = Rv S^T (S Rv S^T + Rn)^-1, sin invertir Rv ni Rn
+        with profiler.stage("restauracion.BMR", imagen=V, K=K):
+            residuo = U - S @ mv
+            X = V - np.mean(V)
+            SX = S @ X
+            sistema = SX @ SX.T + 0.1 * _normal_matrix(M, K) + N0 * np.eye(M)  # S es simétrica: S S^T = S^T S
+            z = cho_solve(cho_factor(sistema, overwrite_a=True), residuo)
+            Sz = S.T @ z
+            restaurada = mv + X @ (X.T @ Sz) + 0.1 * Sz
+
+    return restaurada, U
@@ -0,0 +1,83 @@
+"""Restauraciones bajo demanda: cada método se calcula al mostrarlo o al pedir sus métricas, y se memoriza."""
+import threading
+from collections import OrderedDict
+
+from processing import metrics, restoration
+from processing.volume_cache import array_fingerprint
+
+DEGRADED = "Imagen Degradada"
+DEFAULT_SEED = 0
+
+# Tres vistas x (cuatro métodos + imagen degradada) x dos juegos de parámetros
+RESTORATION_CACHE_SIZE = 36
+
+
+class RestorationStore:
+    """
+    Resultados de restauración memorizados por (corte, vista, método, K, N0, alpha, m1, semilla, PSF).
+
+    Todos los métodos parten de la misma imagen degradada (restoration.degradar la guarda por semilla),
+    así que la vista "Imagen Degradada" es la que se restauró y las métricas son comparables.
+    """
+
+    def __init__(self, max_entries=RESTORATION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, image, view, method, K, N0, alpha, m1, seed, psf):
+        if method == DEGRADED:
+            alpha = m1 = None  # La degradación no depende de los parámetros de restauración
+        elif method not in restoration.RESTORATION_TYPES:
+            raise ValueError(f"Método no reconocido: {method}")
+        return (array_fingerprint(image), view, method, K, N0, alpha, m1, seed, psf)
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _restore(self, image, view, method, K, N0, alpha, m1, seed, psf):
+        key = self._key(image, view, method, K, N0, alpha, m1, seed, psf)
+        entry = self._entry(key)
+        if entry is None:
+            # Todos los métodos restauran la misma imagen degradada, que se calcula una vez
+            degraded = restoration.degradar(image, K, N0, seed, psf)
+            if method == DEGRADED:
+                restored = degraded
+            else:
+                restored = restoration.restaurar_imagen(image, method, K, N0, alpha, m1, U=degraded, psf=psf)[0]
+            entry = {"imagen": restored}
+            self._store(key, entry)
+        return entry
+
+    def result(self, image, view, method, K=10, N0=0.1, alpha=0.1, m1=0.3, seed=DEFAULT_SEED, psf="1D"):
+        """Imagen restaurada con method (o la degradada si method es DEGRADED); se calcula la primera vez"""
+        return self._restore(image, view, method, K, N0, alpha, m1, seed, psf)["imagen"]
+
+    def metrics(self, image, view, method, K=10, N0=0.1, alpha=0.1, m1=0.3, seed=DEFAULT_SEED, psf="1D"):
+        """PSNR, IOSNR, MAE y SSIM de la restauración con method; la restaura si aún no existe"""
+        return self.metrics_for(image, view, [method], K, N0, alpha, m1, seed, psf)[0]
+
+    def metrics_for(self, image, view, methods, K=10, N0=0.1, alpha=0.1, m1=0.3, seed=DEFAULT_SEED, psf="1D"):
+        """Métricas de varios métodos de la misma vista; las que faltan se evalúan con una sola referencia"""
+        entries = [self._restore(image, view, method, K, N0, alpha, m1, seed, psf) for method in methods]
+        missing = [entry for entry in entries if "metricas" not in entry]
+        if missing:
+            scores = metrics.metricas_candidatas(image, [entry["imagen"] for entry in missing])
+            for entry, metricas in zip(missing, scores):
+                entry["metricas"] = metricas
+        return [entry["metricas"] for entry in entries]
+
+    def clear(self):
+        """Descarta todos los resultados"""
+        with self._lock:
+            self._entries.clear()
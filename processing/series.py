@@ -0,0 +1,174 @@
+"""Carga perezosa de series DICOM: indexado de cabeceras y decodificación corte a corte."""
+import os
+import threading
+
+import numpy as np
+from vtkmodules.util import numpy_support
+from vtkmodules.vtkCommonCore import vtkObject
+from vtkmodules.vtkIOImage import vtkDICOMImageReader
+
+from processing.profiling import profiler
+from processing.volume_cache import series_fingerprint
+
+
+def _read_slice(path):
+    """Decodifica un único archivo DICOM y lo devuelve como ndarray 2D (filas, columnas)"""
+    reader = vtkDICOMImageReader()
+    reader.SetFileName(path)
+    reader.Update()
+    output = reader.GetOutput()
+    cols, rows, _ = output.GetDimensions()
+    return numpy_support.vtk_to_numpy(output.GetPointData().GetScalars()).reshape(rows, cols)
+
+
+def index_series(folder):
+    """
+    Lee solo las cabeceras de los archivos de la carpeta y ordena la serie.
+
+    Devuelve (archivos, dims, spacing) con dims = (columnas, filas, cortes) como vtkDICOMImageReader.
+    Los cortes se ordenan igual que vtkDICOMImageReader: por posición descendente a lo largo
+    de la normal del plano de adquisición.
+    """
+    vtkObject.GlobalWarningDisplayOff()
+
+    entries = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            continue
+        reader = vtkDICOMImageReader()
+        reader.SetFileName(path)
+        reader.UpdateInformation()
+        x0, x1, y0, y1, _, _ = reader.GetDataExtent()
+        if x1 < x0 or y1 < y0:
+            continue  # No es un archivo DICOM legible
+
+        orientation = np.array(reader.GetImageOrientationPatient(), dtype=float)
+        normal = np.cross(orientation[:3], orientation[3:])
+        if not normal.any():
+            normal = np.array([0.0, 0.0, 1.0])
+        position = float(np.dot(reader.GetImagePositionPatient(), normal))
+        entries.append((path, (x1 - x0 + 1, y1 - y0 + 1), tuple(reader.GetDataSpacing()), position))
+
+    if not entries:
+        raise ValueError("El directorio no contiene imágenes DICOM válidas.")
+
+    # Conservar solo los cortes con el mismo tamaño que el primero
+    size = entries[0][1]
+    entries = [entry for entry in entries if entry[1] == size]
+    entries.sort(key=lambda entry: -entry[3])
+
+    files = [entry[0] for entry in entries]
+    dims = (size[0], size[1], len(files))
+    return files, dims, entries[0][2]
+
+
+class DicomSeries:
+    """
+    Serie DICOM cuyo volumen se decodifica corte a corte en un buffer preasignado.
+
+    Al crearla solo se indexan las cabeceras y se decodifica el corte axial central; el resto
+    se decodifica bajo demanda con decode_slice() o en segundo plano con start().
+    Si se indica una VolumeCache y la serie ya está en ella, el volumen se mapea desde disco
+    sin decodificar nada; si no, se guarda en la caché al completar la decodificación.
+    """
+
+    def __init__(self, folder, cache=None):
+        self.folder = folder
+        self.cache = cache
+        self.key = None
+        self.borders = None
+        self.from_cache = False
+        self._stop = threading.Event()
+        self._thread = None
+
+        if cache is not None:
+            self.key = series_fingerprint(folder)
+            cached = cache.load(self.key)
+            if cached is not None:
+                self.volume, metadata = cached
+                self.files = metadata["files"]
+                self.dims = tuple(metadata["dims"])
+                self.spacing = tuple(metadata["spacing"])
+                self.borders = tuple(metadata["borders"])
+                self.decoded = np.ones(self.dims[2], dtype=bool)
+                self.from_cache = True
+                return
+
+        self.files, self.dims, self.spacing = index_series(folder)
+
+        # El corte central determina el tipo de dato y el valor de relleno provisional
+        middle = self.dims[2] // 2
+        middle_slice = _read_slice(self.files[middle])
+        self.volume = np.full((self.dims[2], self.dims[1], self.dims[0]), middle_slice.min(), dtype=middle_slice.dtype)
+        self.decoded = np.zeros(self.dims[2], dtype=bool)
+        self.volume[middle] = middle_slice
+        self.decoded[middle] = True
+
+    def decode_slice(self, index):
+        """Decodifica el corte axial index si aún no lo está y lo devuelve"""
+        if not self.decoded[index]:
+            self.volume[index] = _read_slice(self.files[index])
+            self.decoded[index] = True
+        return self.volume[index]
+
+    def decode_all(self):
+        """Decodifica todos los cortes pendientes, empezando por los cercanos al centro"""
+        middle = self.dims[2] // 2
+        with profiler.stage("serie.decodificar", cortes=self.dims[2]):
+            for index in sorted(range(self.dims[2]), key=lambda i: abs(i - middle)):
+                if self._stop.is_set():
+                    return self.volume
+                self.decode_slice(index)
+        if self.cache is not None and not self.from_cache:
+            self.store_in_cache()
+        return self.volume
+
+    def store_in_cache(self):
+        """Guarda el volumen completo y sus metadatos en la caché"""
+        metadata = {
+            "folder": os.path.abspath(self.folder),
+            "files": self.files,
+            "dims": list(self.dims),
+            "spacing": list(self.spacing),
+            "borders": [int(value) for value in self.value_range()],
+        }
+        try:
+            self.cache.store(self.key, self.volume, metadata)
+        except OSError as e:
+            print(f"No se pudo guardar el volumen en caché: {str(e)}")
+
+    def value_range(self):
+        """Valores mínimo y máximo del volumen (definitivos solo cuando está completo)"""
+        if self.borders is not None:
+            return self.borders
+        borders = (self.volume.min(), self.volume.max())
+        if self.is_complete():
+            self.borders = borders
+        return borders
+
+    def start(self):
+        """Inicia la decodificación en segundo plano"""
+        if self.is_complete():
+            return
+        self._thread = threading.Thread(target=self.decode_all, name="dicom-loader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene la decodificación en segundo plano"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def decoded_count(self):
+        return int(self.decoded.sum())
+
+    def is_complete(self):
+        return bool(self.decoded.all())
+
+
+def load_series(folder, cache=None):
+    """Carga una serie completa de forma síncrona; devuelve (volumen, dims, spacing)"""
+    series = DicomSeries(folder, cache)
+    series.decode_all()
+    return series.volume, series.dims, series.spacing
@@ -0,0 +1,150 @@
+"""Caché en disco de volúmenes decodificados (.npy mapeable en memoria + metadatos JSON)."""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get("DICOM_VIEWER_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "dicom_viewer"))
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def series_fingerprint(folder):
+    """
+    Clave de la serie a partir de las rutas, tamaños y fechas de modificación de sus archivos.
+
+    Solo usa os.stat, por lo que no necesita abrir ningún archivo.
+    """
+    digest = hashlib.sha1()
+    with os.scandir(folder) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            info = entry.stat()
+            digest.update(f"{os.path.abspath(entry.path)}|{info.st_size}|{info.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def array_fingerprint(array):
+    """Clave en memoria de un array por su contenido, forma y tipo (para cachés de resultados por corte)"""
+    array = np.ascontiguousarray(array)
+    return array.shape, array.dtype.str, hashlib.blake2b(array, digest_size=16).digest()
+
+
+class VolumeCache:
+    """
+    Guarda cada volumen como <clave>.npy junto a <clave>.json (dims, spacing, borders, archivos).
+
+    Al superar max_bytes se eliminan las entradas usadas hace más tiempo (LRU por fecha de acceso,
+    que se renueva en cada lectura).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".npy", base + ".json"
+
+    def load(self, key):
+        """Devuelve (volumen mapeado en memoria de solo lectura, metadatos) o None si no está en caché"""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            volume = np.load(data_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        os.utime(meta_path)  # Marcar como usado recientemente
+        return volume, metadata
+
+    def store(self, key, volume, metadata):
+        """Escribe el volumen y sus metadatos; la entrada solo es válida cuando existe el JSON"""
+        os.makedirs(self.directory, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+
+        # Escritura atómica: archivo temporal y reemplazo
+        tmp_data = data_path + ".tmp"
+        with open(tmp_data, "wb") as f:
+            np.save(f, np.ascontiguousarray(volume))
+        os.replace(tmp_data, data_path)
+
+        tmp_meta = meta_path + ".tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_meta, meta_path)
+
+        self.evict(keep=key)
+
+    def entries(self):
+        """Lista (clave, bytes, último acceso) de las entradas válidas"""
+        if not os.path.isdir(self.directory):
+            return []
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-5]
+            data_path, meta_path = self._paths(key)
+            try:
+                result.append((key, os.path.getsize(data_path), os.path.getmtime(meta_path)))
+            except OSError:
+                continue
+        return result
+
+    def size(self):
+        return sum(entry[1] for entry in self.entries())
+
+    def evict(self, keep=None):
+        """Elimina las entradas menos usadas hasta respetar max_bytes"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(entry[1] for entry in entries)
+        for key, nbytes, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            if self.remove(key):
+                total -= nbytes
+
+    def remove(self, key):
+        """Elimina una entrada; devuelve False si no se pudo (p. ej. el archivo sigue mapeado)"""
+        removed = True
+        for path in self._paths(key)[::-1]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                removed = False
+        return removed
+
+    def clear(self):
+        """Vacía la caché; devuelve el número de entradas y los bytes liberados"""
+        removed, freed = 0, 0
+        for key, nbytes, _ in self.entries():
+            if self.remove(key):
+                removed += 1
+                freed += nbytes
+        return removed, freed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gestiona la caché en disco de volúmenes decodificados.")
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help=f"Carpeta de la caché (por defecto: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--clear", action="store_true", help="Elimina todos los volúmenes guardados")
+    args = parser.parse_args(argv)
+
+    cache = VolumeCache(args.dir)
+    if args.clear:
+        removed, freed = cache.clear()
+        print(f"Eliminados {removed} volúmenes ({freed / 1024 ** 2:.1f} MB) de {args.dir}")
+    else:
+        print(f"{len(cache.entries())} volúmenes ({cache.size() / 1024 ** 2:.1f} MB) en {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
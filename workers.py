@@ -0,0 +1,110 @@
+"""Planificador de trabajos en segundo plano para no bloquear el bucle de eventos de Qt."""
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from processing.profiling import profiler
+
+
+def _run_stage(name, task):
+    """Ejecuta una tarea midiéndola como etapa del perfilador"""
+    with profiler.stage(name):
+        return task()
+
+
+class JobScheduler(QObject):
+    """
+    Ejecuta tareas de procesamiento en un pool de hilos y entrega los resultados al hilo de la interfaz.
+
+    Cada llamada a submit() reemplaza al trabajo anterior: las tareas que aún no empezaron se
+    cancelan y los resultados de trabajos ya superados se descartan al llegar.
+    """
+
+    job_finished = pyqtSignal(int, object)
+    job_failed = pyqtSignal(int, str)
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dicom-job")
+        self._generation = 0
+        self._futures = []
+        self._callbacks = {}
+
+        # Las señales emitidas desde los hilos del pool llegan encoladas al hilo de la interfaz
+        self.job_finished.connect(self._dispatch_result)
+        self.job_failed.connect(self._dispatch_error)
+
+    def submit(self, tasks, on_done, on_error=None, name="trabajo"):
+        """
+        Lanza una lista de tareas (funciones sin argumentos) en paralelo.
+
+        on_done recibe la lista de resultados en el mismo orden que las tareas;
+        on_error recibe el mensaje de error si alguna tarea falla.
+        name identifica al trabajo y a sus tareas en el perfilador.
+        """
+        self.cancel()
+        job_id = self._generation
+        self._callbacks[job_id] = (on_done, on_error, name, time.perf_counter(), len(tasks))
+
+        results = [None] * len(tasks)
+        remaining = [len(tasks)]
+
+        def collect(index, future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                message = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                self.job_failed.emit(job_id, message)
+                return
+            results[index] = future.result()
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                self.job_finished.emit(job_id, results)
+
+        for index, task in enumerate(tasks):
+            future = self._executor.submit(_run_stage, f"{name}.tarea", task)
+            future.add_done_callback(lambda f, i=index: collect(i, f))
+            self._futures.append(future)
+
+        return job_id
+
+    def cancel(self):
+        """Cancela las tareas pendientes e invalida los resultados del trabajo en curso"""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._callbacks.clear()
+        self._generation += 1
+
+    def is_busy(self):
+        """Indica si hay un trabajo vigente sin terminar"""
+        return any(not future.done() for future in self._futures)
+
+    def is_current(self, job_id):
+        """Indica si job_id es el trabajo vigente y aún no entregó sus resultados"""
+        return job_id == self._generation and job_id in self._callbacks
+
+    def shutdown(self):
+        """Detiene el pool sin esperar a las tareas en ejecución"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_result(self, job_id, results):
+        callbacks = self._callbacks.pop(job_id, None)
+        if callbacks is None or job_id != self._generation:
+            return  # Trabajo superado por uno más reciente
+        self._futures = []
+        on_done, _, name, start, n_tasks = callbacks
+        profiler.record(name, start, time.perf_counter(), tareas=n_tasks)
+        on_done(results)
+
+    def _dispatch_error(self, job_id, message):
+        callbacks = self._callbacks.pop(job_id, None)
+        if callbacks is None or job_id != self._generation:
+            return
+        self.cancel()
+        if callbacks[1] is not None:
+            callbacks[1](message)